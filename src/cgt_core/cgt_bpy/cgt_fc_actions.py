@@ -1,9 +1,29 @@
 import bpy
-from typing import List
+import logging
+import numpy as np
+from typing import List, Dict, Tuple, Any
 from collections import namedtuple
 
 
 class FCurveHelper:
+    # points appended to curves this many times longer are set one by one
+    assign_ratio: int = 32
+    # interpolation and handle types of written keyframes
+    interpolation: str = 'BEZIER'
+    handle_type: str = 'AUTO_CLAMPED'
+    # enum values used by foreach_set (blenders BEZT_IPO_* and HD_* values)
+    interpolation_values = {'CONSTANT': 0, 'LINEAR': 1, 'BEZIER': 2}
+    handle_type_values = {'FREE': 0, 'AUTO': 1, 'VECTOR': 2, 'ALIGNED': 3, 'AUTO_CLAMPED': 4}
+    # keyframe point fields: components per point, dtype
+    point_fields = {
+        'co':                   (2, np.float32),
+        'handle_left':          (2, np.float32),
+        'handle_right':         (2, np.float32),
+        'interpolation':        (1, np.int32),
+        'handle_left_type':     (1, np.int32),
+        'handle_right_type':    (1, np.int32),
+    }
+
     def __init__(self):
         """ Helper class to easily set and insert data to an objects f-curves. """
         self.location, self.scale, self.rotation_euler = [None, None, None], [None, None, None], [None, None, None]
@@ -21,20 +41,105 @@ class FCurveHelper:
             fc.keyframe_points.insert(
                 frame=frame, value=sample, options={'FAST'}, keyframe_type='JITTER')
 
-    def foreach_set(self, data_path: str, frames: List[int], *args: List[float]):
+    def new_points(self, frames) -> Dict[str, np.ndarray]:
+        """ Preallocated point fields for the frames, values have to be set in the second co column.
+            The handles share the co buffer, so they are located at the keyframe until the f-curve gets updated. """
+        co = np.empty((len(frames), 2), dtype=np.float32)
+        co[:, 0] = frames
+        handle_type = np.full((len(frames), 1), self.handle_type_values[self.handle_type], dtype=np.int32)
+        return {
+            'co':                   co,
+            'handle_left':          co,
+            'handle_right':         co,
+            'interpolation':        np.full(
+                (len(frames), 1), self.interpolation_values[self.interpolation], dtype=np.int32),
+            'handle_left_type':     handle_type,
+            'handle_right_type':    handle_type,
+        }
+
+    def read_points(self, points: bpy.types.FCurveKeyframePoints) -> Dict[str, np.ndarray]:
+        fields = {}
+        for field, (size, dtype) in self.point_fields.items():
+            fields[field] = np.empty((len(points), size), dtype=dtype)
+            points.foreach_get(field, fields[field].ravel())
+        return fields
+
+    @staticmethod
+    def write_points(points: bpy.types.FCurveKeyframePoints, fields: Dict[str, np.ndarray]):
+        for field, values in fields.items():
+            points.foreach_set(field, values.ravel())
+
+    def foreach_set(self, data_path: str, frames: List[int], *args: List[float], append: bool = False):
         """ Set multiple keyframes at once.
             data_path: String Enum [location, scale, rotation_euler, rotation_quaternion]
-            frames: flat list of int
-            args: flat lists of float """
+            frames: flat list or array of int
+            args: flat lists or arrays of float
+            append: merge the keyframes into the existing keyframes instead of replacing the f-curves """
+        if append:
+            return self.merge(data_path, frames, *args)
+
         f_curves = self.get_f_curves(data_path)
+        fields = self.new_points(frames)
 
         for samples, fc in zip(args, f_curves):
-            if hasattr(fc.keyframe_points, 'clear'):
-                fc.keyframe_points.clear()
-            fc.keyframe_points.add(count=len(frames))
-            fc.keyframe_points.foreach_set("co", [x for co in zip(frames, samples) for x in co])
+            fields['co'][:, 1] = samples
+            self.resize(fc.keyframe_points, len(frames))
+            self.write_points(fc.keyframe_points, fields)
             fc.update()
 
+    def merge(self, data_path: str, frames: List[int], *args: List[float], start: float = None, end: float = None):
+        """ Merges a block of keyframes into the f-curves, existing keyframes from start to end get replaced.
+            Blocks behind the last keyframe only get added, so streamed data can be written in chunks.
+            data_path: String Enum [location, scale, rotation_euler, rotation_quaternion]
+            frames: ascending list or array of int
+            args: lists or arrays of float
+            start, end: replaced frame range, defaults to the first and last frame of the block """
+        f_curves = self.get_f_curves(data_path)
+        start = frames[0] if start is None else start
+        end = frames[-1] if end is None else end
+        added = self.new_points(frames)
+
+        for samples, fc in zip(args, f_curves):
+            points = fc.keyframe_points
+            count = len(points)
+            added['co'][:, 1] = samples
+
+            if count > len(frames) * self.assign_ratio and points[-1].co[0] < start - .5:
+                # set the added points only instead of rewriting the whole curve
+                points.add(count=len(frames))
+                for idx, co in enumerate(added['co'], count):
+                    point = points[idx]
+                    point.co = point.handle_left = point.handle_right = co
+                    point.interpolation = self.interpolation
+                    point.handle_left_type = point.handle_right_type = self.handle_type
+                fc.update()
+                continue
+
+            # keyframes are sorted by frame after updating the f-curve
+            existing = self.read_points(points)
+            first = int(np.searchsorted(existing['co'][:, 0], start - .5))
+            last = int(np.searchsorted(existing['co'][:, 0], end + .5))
+            merged = {
+                field: np.concatenate((values[:first], added[field], values[last:]))
+                for field, values in existing.items()
+            }
+            self.resize(points, len(merged['co']))
+            self.write_points(points, merged)
+            fc.update()
+
+    @staticmethod
+    def resize(points: bpy.types.FCurveKeyframePoints, count: int):
+        """ Adds or removes keyframe points to match the count, point data is undefined afterwards. """
+        if count > len(points):
+            points.add(count=count - len(points))
+        elif count < len(points):
+            if hasattr(points, 'clear'):
+                points.clear()
+                points.add(count=count)
+            else:
+                for _ in range(len(points) - count):
+                    points.remove(points[-1], fast=True)
+
     def update(self, data_path: str):
         if not hasattr(self, data_path):
             raise KeyError
@@ -50,65 +155,135 @@ class FCurveHelper:
         return s
 
 
-def create_actions(objects, overwrite: bool = True):
-    actions = []
+class ActionRegistry:
+    """ Gets or creates the actions and f-curves of objects once and caches their helpers,
+        so repeated writes to the objects don't redo the discovery. """
+    helpers: Dict[Any, FCurveHelper]
+    # f-curves per data path
+    channels = {'location': 3, 'rotation_euler': 3, 'scale': 3, 'rotation_quaternion': 4}
 
-    # get or create actions for objs
-    for ob in objects:
-        action_name = ob.name
-        ad = ob.animation_data_create()
+    def __init__(self, overwrite: bool = True, data_paths: List[str] = None):
+        """ overwrite: replace the objects actions once registered, else reuse existing actions.
+            data_paths: f-curves created on registration, defaults to all. """
+        self.overwrite = overwrite
+        self.data_paths = list(self.channels) if data_paths is None else data_paths
+        self.helpers = {}
 
-        # remove old action from objects animation data (default)
-        action_data = bpy.data.actions
-        if action_name in action_data:
-            if overwrite is True:
-                action_data.remove(action_data[action_name])
-            else:
-                actions.append(action_data[action_name])
-                ad.action = action_data[action_name]
+    def register(self, objects) -> List[FCurveHelper]:
+        """ Gets or creates actions and f-curves for the objects in one pass, returns their helpers. """
+        # look up actions by name once instead of per object
+        actions = {action.name: action for action in bpy.data.actions}
+
+        for ob in objects:
+            if ob in self.helpers:
                 continue
 
-        # create new action
-        new_action = bpy.data.actions.new(action_name)
-        actions.append(new_action)
-        ad.action = new_action
-
-    fc_helpers = []
-
-    # get or create fcurves for actions
-    for action in actions:
-        # add existing data_paths to helper obj
-        helper = FCurveHelper()
-        offset, last = 0, None
-
-        fc_data_paths = set()
-        for i, fc in action.fcurves.items():
-            if fc.group.name != last:
-                fc_data_paths.add(fc.group.name)
-                last = fc.group.name
-                offset = i
-            m_data_path = getattr(helper, fc.group.name)
-            m_data_path[i - offset] = fc
-
-        # add new fcurve
-        for data_path, indexes in [('location', 3), ('rotation_euler', 3), ('scale', 3), ('rotation_quaternion', 4)]:
-            if data_path in fc_data_paths:
+            ad = ob.animation_data_create()
+            action = actions.get(ob.name)
+            if action is not None and self.overwrite:
+                bpy.data.actions.remove(action)
+                action = None
+            if action is None and not self.overwrite:
+                action = ad.action
+            if action is None:
+                action = bpy.data.actions.new(ob.name)
+                actions[action.name] = action
+            ad.action = action
+
+            helper = FCurveHelper()
+            for fc in action.fcurves:
+                f_curves = getattr(helper, fc.data_path, None)
+                if f_curves is not None and fc.array_index < len(f_curves):
+                    f_curves[fc.array_index] = fc
+            for data_path in self.data_paths:
+                self.add_f_curves(action, helper, data_path)
+            self.helpers[ob] = helper
+        return [self.helpers[ob] for ob in objects]
+
+    @staticmethod
+    def add_f_curves(action: bpy.types.Action, helper: FCurveHelper, data_path: str):
+        """ Creates the missing f-curves of the data path. """
+        f_curves = helper.get_f_curves(data_path)
+        for i, fc in enumerate(f_curves):
+            if fc is not None:
                 continue
+            try:
+                f_curves[i] = action.fcurves.new(data_path=data_path, index=i, action_group=data_path)
+            except RuntimeError:
+                # f-curve exists, but wasn't part of the helper
+                f_curves[i] = action.fcurves.find(data_path, index=i)
+
+    def get(self, ob, data_path: str = None) -> FCurveHelper:
+        """ Helper of the object, registers the object and creates the f-curves of the data path if missing. """
+        helper = self.helpers.get(ob)
+        if helper is None:
+            helper = self.register([ob])[0]
+        if data_path is not None and None in helper.get_f_curves(data_path):
+            self.add_f_curves(ob.animation_data.action, helper, data_path)
+        return helper
+
+    def discard(self, ob):
+        self.helpers.pop(ob, None)
+
+
+class KeyframeWriter:
+    """ Accumulates samples of objects per data path and writes them in bulk to the objects f-curves.
+        Inserting keyframes one by one updates the object and its f-curves on every insert.
+        Only keyframes get written, setting the objects properties is up to the caller. """
+    samples: Dict[Tuple[Any, str], Tuple[List[int], List[List[float]]]]
+    actions: ActionRegistry
+    # last written frame per object and data path
+    written: Dict[Tuple[Any, str], int]
+
+    def __init__(self, flush_step: int = 16):
+        """ flush_step: frames accumulated before writing, call step once per frame. """
+        self.flush_step = flush_step
+        self.samples = {}
+        # keyframes are added to the objects actions, f-curves get created once written to
+        self.actions = ActionRegistry(overwrite=False, data_paths=[])
+        self.written = {}
+        self.steps = 0
+
+    def add(self, ob, data_path: str, frame: int, values):
+        """ data_path: String Enum [location, scale, rotation_euler, rotation_quaternion] """
+        key = (ob, data_path)
+        if key not in self.samples:
+            self.samples[key] = ([], [[] for _ in values])
+
+        frames, channels = self.samples[key]
+        frames.append(frame)
+        for channel, value in zip(channels, values):
+            channel.append(value)
+
+    def step(self):
+        """ Flushes every flush_step frames. """
+        self.steps += 1
+        if self.steps >= self.flush_step:
+            self.flush()
+
+    def flush(self):
+        """ Writes the accumulated samples to the objects f-curves.
+            Previous keyframes get replaced from the first written frame onwards to the last written frame. """
+        for (ob, data_path), (frames, channels) in self.samples.items():
+            try:
+                helper = self.actions.get(ob, data_path)
+                start = self.written.get((ob, data_path), frames[0] - 1) + 1
+                helper.merge(data_path, frames, *channels, start=min(start, frames[0]))
+                self.written[(ob, data_path)] = frames[-1]
+            except ReferenceError:
+                # object has been removed while recording
+                logging.debug(f"Cannot write keyframes of removed object to {data_path}")
+                self.actions.discard(ob)
+                self.written.pop((ob, data_path), None)
 
-            for i in range(0, indexes):
-                try:
-                    fc = action.fcurves.new(
-                        data_path=data_path,
-                        index=i,
-                        action_group=data_path)
+        self.samples.clear()
+        self.steps = 0
 
-                    m_data_path = getattr(helper, fc.group.name)
-                    m_data_path[i] = fc
-                except RuntimeError:
-                    pass
 
-        fc_helpers.append(helper)
-    return fc_helpers
+def create_actions(objects, overwrite: bool = True) -> List[FCurveHelper]:
+    """ Gets or creates actions and f-curves for the objects,
+        use an ActionRegistry to write to the same objects multiple times. """
+    return ActionRegistry(overwrite).register(objects)
 
 
 def main():
@@ -0,0 +1,210 @@
+from __future__ import annotations
+from typing import Any, Dict, Tuple
+import numpy as np
+
+from ..cgt_patterns import cgt_nodes
+
+
+# region filters
+class ExponentialFilter:
+    """ Exponential moving average, alpha weights the current sample. """
+    def __init__(self, shape: Tuple[int, ...], alpha: float = .5):
+        self.alpha = alpha
+        self.value = np.zeros(shape)
+        self.initialized = False
+
+    def reset(self):
+        self.initialized = False
+
+    def __call__(self, x: np.ndarray, dt: float) -> np.ndarray:
+        if not self.initialized:
+            self.value[:] = x
+            self.initialized = True
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class OneEuroFilter:
+    """ Speed adaptive low pass filter, smooths strongly at low speeds and reduces lag at high speeds.
+        Casiez et al. 2012: https://gery.casiez.net/1euro/ """
+    def __init__(self, shape: Tuple[int, ...], min_cutoff: float = 1., beta: float = 1., d_cutoff: float = 1.):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.value = np.zeros(shape)
+        self.derivative = np.zeros(shape)
+        self.cutoff = np.zeros(shape)
+        self.delta = np.zeros(shape)
+        self.initialized = False
+
+    def reset(self):
+        self.initialized = False
+
+    @staticmethod
+    def smoothing_factor(cutoff, dt: float):
+        tau = 1. / (2 * np.pi * cutoff)
+        return 1. / (1. + tau / dt)
+
+    def __call__(self, x: np.ndarray, dt: float) -> np.ndarray:
+        if not self.initialized:
+            self.value[:] = x
+            self.derivative[:] = 0
+            self.initialized = True
+            return self.value
+
+        # filtered speed
+        np.subtract(x, self.value, out=self.delta)
+        self.delta /= dt
+        self.derivative += self.smoothing_factor(self.d_cutoff, dt) * (self.delta - self.derivative)
+
+        # cutoff frequency adapts to the speed
+        np.abs(self.derivative, out=self.cutoff)
+        self.cutoff *= self.beta
+        self.cutoff += self.min_cutoff
+
+        np.subtract(x, self.value, out=self.delta)
+        self.delta *= self.smoothing_factor(self.cutoff, dt)
+        self.value += self.delta
+        return self.value
+
+
+class SavitzkyGolayFilter:
+    """ Causal Savitzky-Golay filter, fits a polynomial to the last samples and evaluates it at the current one.
+        Samples are kept in a ring buffer, uses the available samples until the window is filled. """
+    def __init__(self, shape: Tuple[int, ...], window: int = 7, order: int = 2):
+        assert window > order, "Window has to be larger than the polynomial order."
+        self.window = window
+        self.order = order
+        self.samples = np.zeros((window, *shape))
+        self.value = np.zeros(shape)
+        self.coefficients = [self.get_coefficients(n, min(order, n - 1)) for n in range(1, window + 1)]
+        self.count = 0
+        self.idx = 0
+
+    @staticmethod
+    def get_coefficients(window: int, order: int) -> np.ndarray:
+        """ Weights of samples (oldest to newest) to evaluate the fitted polynomial at the newest sample. """
+        t = np.arange(-window + 1, 1)
+        vandermonde = np.vander(t, order + 1, increasing=True)
+        return np.linalg.pinv(vandermonde)[0]
+
+    def reset(self):
+        self.count = 0
+        self.idx = 0
+
+    def __call__(self, x: np.ndarray, dt: float) -> np.ndarray:
+        self.samples[self.idx] = x
+        self.idx = (self.idx + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+
+        if self.count < self.window:
+            # samples are stored in order while filling
+            coefficients, samples = self.coefficients[self.count - 1], self.samples[:self.count]
+        else:
+            # the oldest sample is located at idx
+            coefficients, samples = np.roll(self.coefficients[-1], self.idx), self.samples
+        np.dot(coefficients, samples.reshape(len(samples), -1), out=self.value.reshape(-1))
+        return self.value
+# endregion
+
+
+class LandmarkFilterNode(cgt_nodes.CalculatorNode):
+    """ Filters the landmark lists `[[idx, [x, y, z]], ...]` of (nested) detection results over time.
+        Every landmark list gets filtered separately based on its position in the results,
+        the filter state resets if a landmark list hasn't been detected in a frame.
+        Repeated (duplicated) input frames return the previous results without advancing the filter,
+        so calculators can still detect duplicated frames. """
+    filter_types = {
+        'EXPONENTIAL':      ExponentialFilter,
+        'ONE_EURO':         OneEuroFilter,
+        'SAVITZKY_GOLAY':   SavitzkyGolayFilter,
+    }
+    filters: Dict[Tuple[int, ...], Any]
+    # preallocated (N, 3) input and previous input by path
+    inputs: Dict[Tuple[int, ...], np.ndarray]
+    prev_inputs: Dict[Tuple[int, ...], np.ndarray]
+
+    def __init__(self, filter_type: str = 'ONE_EURO', frequency: float = 30., **filter_kwargs):
+        """ frequency: frames per second, used to convert frames to time.
+            filter_kwargs: passed to the filter, e.g. min_cutoff and beta for the one euro filter. """
+        assert filter_type in self.filter_types, f"Filter type has to be in {list(self.filter_types)}"
+        self.filter_type = filter_type
+        self.frequency = frequency
+        self.filter_kwargs = filter_kwargs
+        self.reset()
+
+    def reset(self):
+        self.filters = {}
+        self.inputs = {}
+        self.prev_inputs = {}
+        self.prev_frame = None
+
+    def update(self, data: Any, frame: int):
+        dt = 1. / self.frequency
+        if self.prev_frame is not None and frame > self.prev_frame:
+            dt *= frame - self.prev_frame
+        self.prev_frame = frame
+
+        detected = set()
+        data = self.filter_data(data, dt, (), detected)
+        for path in [path for path in self.filters if path not in detected]:
+            del self.filters[path]
+            del self.inputs[path]
+            del self.prev_inputs[path]
+        return data, frame
+
+    @staticmethod
+    def is_landmark_list(data: Any) -> bool:
+        return (len(data) > 0 and isinstance(data[0], list) and len(data[0]) == 2
+                and isinstance(data[0][0], int) and len(data[0][1]) == 3)
+
+    def filter_data(self, data: Any, dt: float, path: Tuple[int, ...], detected: set):
+        if not isinstance(data, list):
+            return data
+        if not self.is_landmark_list(data):
+            return [self.filter_data(d, dt, path + (i,), detected) for i, d in enumerate(data)]
+
+        detected.add(path)
+        landmarks = self.inputs.get(path)
+        if landmarks is None or len(landmarks) != len(data):
+            shape = (len(data), 3)
+            landmarks = self.inputs[path] = np.empty(shape)
+            self.prev_inputs[path] = np.full(shape, np.nan)
+            self.filters[path] = self.filter_types[self.filter_type](shape, **self.filter_kwargs)
+
+        # converted in place, no array gets allocated
+        landmarks[:] = [landmark[1] for landmark in data]
+
+        landmark_filter = self.filters[path]
+        prev_landmarks = self.prev_inputs[path]
+        if np.array_equal(landmarks, prev_landmarks):
+            # duplicated frame, the filter value remains the previous result
+            filtered = landmark_filter.value
+        else:
+            np.copyto(prev_landmarks, landmarks)
+            filtered = landmark_filter(landmarks, dt)
+        return [[landmark[0], location] for landmark, location in zip(data, filtered.tolist())]
+
+    def process_sequence(self, landmarks: np.ndarray, frames: np.ndarray = None) -> np.ndarray:
+        """ Filters a (F, N, 3) landmark array, frames containing nan values reset the filter. """
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        if frames is None:
+            frames = np.arange(len(landmarks))
+
+        filtered = np.full(landmarks.shape, np.nan)
+        landmark_filter = self.filter_types[self.filter_type](landmarks.shape[1:], **self.filter_kwargs)
+        valid = np.all(np.isfinite(landmarks.reshape(len(landmarks), -1)), axis=1)
+        prev_frame = None
+        for i in range(len(landmarks)):
+            if not valid[i]:
+                landmark_filter.reset()
+                prev_frame = None
+                continue
+
+            dt = 1. / self.frequency
+            if prev_frame is not None and frames[i] > prev_frame:
+                dt *= frames[i] - prev_frame
+            prev_frame = frames[i]
+            filtered[i] = landmark_filter(landmarks[i], dt)
+        return filtered
@@ -1,6 +1,6 @@
 import numpy as np
 import logging
-from mathutils import Euler
+import copy
 from . import cgt_math
 
 
@@ -16,21 +16,67 @@ class CustomData:
 
 class ProcessorUtils:
     data = None
-    # array for comparison, as noise is present every frame values should change
     frame = 0
-    prev_rotation = {}
-    prev_sum = [0.0, 0.0]
+    # state carried from frame to frame, initialized per instance (see reset)
+    # prev_rotation: previous euler rotations by combat index
+    # prev_frames: previous landmark bytes by stream, as noise is present every frame values should change
+    # duplicated_frames: count of dropped duplicated frames by stream
+    prev_rotation: dict = None
+    prev_frames: dict = None
+    duplicated_frames: dict = None
+    state_attributes = ['frame', 'prev_rotation', 'prev_frames', 'duplicated_frames']
+    # combat method for sequences: 'SCAN' matches try_get_euler frame by frame,
+    # 'UNWRAP' is vectorized and keeps rotation tracks continuous but may pick other euler solutions
+    sequence_combat_modes = ['SCAN', 'UNWRAP']
+    sequence_combat_mode = 'SCAN'
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """ Resets the state carried from frame to frame, e.g. to process a new recording. """
+        self.frame = 0
+        self.prev_rotation = {}
+        self.prev_frames = {}
+        self.duplicated_frames = {}
+
+    def snapshot(self) -> dict:
+        """ Returns a copy of the state carried from frame to frame, see restore. """
+        return copy.deepcopy({attr: getattr(self, attr) for attr in self.state_attributes})
+
+    def restore(self, state: dict):
+        """ Restores a state created by snapshot. The state may be restored on multiple instances
+            to continue processing from the same point, e.g. when processing chunks in parallel. """
+        for attr, value in copy.deepcopy(state).items():
+            setattr(self, attr, value)
 
     def has_duplicated_results(self, data=None, detector_type=None, idx=0):
-        """ Sums data array values and compares them each frame to avoid duplicated values
-            in the timeline. This fixes duplicated frame issue mainly occurring on Windows. """
-        summed = np.sum([v[1] for v in data[:21]])
-        if summed == self.prev_sum[idx]:
+        """ Compares the landmarks of a stream (detector type and idx) with the previous frame of the stream
+            to avoid duplicated values in the timeline. This fixes duplicated frame issue mainly occurring on Windows.
+            Data may be a landmark array or a list of [idx, landmark] pairs, duplicates are counted per stream.
+            Empty data (nothing detected) never counts as duplicate and doesn't replace the previous frame. """
+        if data is None or len(data) == 0:
+            return False
+
+        if isinstance(data, np.ndarray):
+            landmarks = np.ascontiguousarray(data).tobytes()
+        else:
+            landmarks = np.array([landmark[1] for landmark in data], dtype=np.float64).tobytes()
+
+        stream = (detector_type, idx)
+        if self.prev_frames.get(stream) == landmarks:
+            self.duplicated_frames[stream] = self.duplicated_frames.get(stream, 0) + 1
+            logging.debug(f"Dropped duplicated frame of stream {stream}")
             return True
 
-        self.prev_sum[idx] = summed
+        self.prev_frames[stream] = landmarks
         return False
 
+    def get_duplicated_frame_count(self, detector_type=None) -> int:
+        """ Returns the count of dropped duplicated frames of all streams or of a detector type. """
+        return sum(count for (stream_type, _), count in self.duplicated_frames.items()
+                   if detector_type is None or stream_type == detector_type)
+
     def quart_to_euler_combat(self, quart, idx, idx_offset=0, axis='XYZ'):
         """ Converts quart to euler rotation while comparing with previous rotation. """
         if len(self.prev_rotation) > 0:
@@ -49,7 +95,7 @@ class ProcessorUtils:
         if offset is None:
             return euler
 
-        rotation = Euler((
+        rotation = cgt_math.create_euler((
             euler[0] + np.pi * offset[0],
             euler[1] + np.pi * offset[1],
             euler[2] + np.pi * offset[2],
@@ -86,3 +132,65 @@ class ProcessorUtils:
             self.prev_rotation[prev_rot_idx] = self.offset_euler(euler_rot, offset)
             return self.prev_rotation[prev_rot_idx]
 
+    def try_get_sequence_eulers(self, quaternions: np.ndarray, prev_rot_indices: list, offsets: list = None):
+        """ Gets the eulers of (F, K, 4) quaternions, the previously created rotation of each of the
+            K prev_rot_indices is used as combat, see try_get_euler and sequence_combat_mode.
+            Returns (F, K, 3) eulers, frames containing invalid quaternions are nan. """
+        if offsets is None:
+            offsets = [None] * len(prev_rot_indices)
+        offsets = [(0.0, 0.0, 0.0) if offset is None else tuple(np.pi * o for o in offset) for offset in offsets]
+
+        solutions = cgt_math.batch_euler_solutions(quaternions)
+        frames = np.flatnonzero(np.all(np.isfinite(solutions), axis=(0, 2, 3)))
+        eulers = np.full(solutions.shape[1:], np.nan)
+        if len(frames) == 0:
+            return eulers
+
+        if self.sequence_combat_mode == 'UNWRAP':
+            eulers[frames] = self.unwrap_sequence_eulers(quaternions[frames], prev_rot_indices, offsets)
+        else:
+            eulers[frames] = self.scan_sequence_eulers(solutions[:, frames], prev_rot_indices, offsets)
+
+        for idx, euler in zip(prev_rot_indices, eulers[frames[-1]]):
+            self.prev_rotation[idx] = cgt_math.create_euler(euler)
+        return eulers
+
+    def scan_sequence_eulers(self, solutions: np.ndarray, prev_rot_indices: list, offsets: list):
+        """ Picks (F, K, 3) eulers from (2, F, K, 3) finite euler solutions frame by frame like try_get_euler. """
+        eulers = np.empty(solutions.shape[1:])
+
+        # the scan runs on python floats as every euler depends on its predecessor
+        for k, (idx, offset) in enumerate(zip(prev_rot_indices, offsets)):
+            # the first rotation of an index gets calculated without combat offset
+            initialized = idx in self.prev_rotation
+            rotation = tuple(self.prev_rotation[idx]) if initialized else (0.0, 0.0, 0.0)
+
+            track = []
+            for eul1, eul2 in zip(solutions[0, :, k].tolist(), solutions[1, :, k].tolist()):
+                ox, oy, oz = offset if initialized else (0.0, 0.0, 0.0)
+                compat = (rotation[0] - ox, rotation[1] - oy, rotation[2] - oz)
+                eul1 = cgt_math.compatible_euler(eul1, compat)
+                eul2 = cgt_math.compatible_euler(eul2, compat)
+                distance1 = abs(eul1[0] - compat[0]) + abs(eul1[1] - compat[1]) + abs(eul1[2] - compat[2])
+                distance2 = abs(eul2[0] - compat[0]) + abs(eul2[1] - compat[1]) + abs(eul2[2] - compat[2])
+                x, y, z = eul2 if distance1 > distance2 else eul1
+                rotation = (x + ox, y + oy, z + oz)
+                track.append(rotation)
+                initialized = True
+            eulers[:, k] = track
+        return eulers
+
+    def unwrap_sequence_eulers(self, quaternions: np.ndarray, prev_rot_indices: list, offsets: list):
+        """ Converts (F, K, 4) finite quaternions to continuous (F, K, 3) eulers at once. """
+        offsets = np.array(offsets)
+        initialized = np.array([idx in self.prev_rotation for idx in prev_rot_indices])
+        compat = np.array([
+            self.prev_rotation[idx] if idx in self.prev_rotation else [0.0, 0.0, 0.0]
+            for idx in prev_rot_indices], dtype=np.float64)
+        compat[initialized] -= offsets[initialized]
+
+        eulers = cgt_math.batch_unwrap_eulers(quaternions, compat)
+        # like try_get_euler, the first rotation of an index gets calculated without combat offset
+        eulers[1:] += offsets
+        eulers[0, initialized] += offsets[initialized]
+        return eulers
@@ -1,6 +1,324 @@
 import numpy as np
-from mathutils import Euler, Matrix, Vector, Quaternion
-from math import radians
+from math import radians, floor, copysign, tau
+
+try:
+    from mathutils import Euler, Matrix, Vector, Quaternion
+except ModuleNotFoundError:
+    # headless usage outside of blender, rotations fall back to the numpy backend
+    Euler = Matrix = Vector = Quaternion = None
+
+
+# region batched kernels
+# Kernels operate on the last axis and broadcast over all leading axes,
+# so (3, ), (N, 3) and (F, N, 3) shaped arrays can be processed in a single call.
+# normalize and angle_between keep their own implementation as they
+# treat multidimensional input as a single matrix (see joint_angle).
+def batch_vector_length(vectors: np.ndarray) -> np.ndarray:
+    """ returns the lengths of (..., 3) vectors as (...) array. """
+    return np.sqrt(np.sum(vectors ** 2, axis=-1))
+
+
+def batch_to_vector(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """ returns (..., 3) vectors from origins to destinations. """
+    return np.subtract(destinations, origins)
+
+
+def batch_normalize(vectors: np.ndarray) -> np.ndarray:
+    """ returns the unit vectors of (..., 3) vectors. """
+    vectors = np.asarray(vectors)
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def batch_dot(v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+    """ returns the row wise dot product of (..., 3) vectors as (...) array. """
+    return np.sum(np.multiply(v1, v2), axis=-1)
+
+
+def batch_angle_between(v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+    """ returns the angles in radians between (..., 3) vectors as (...) array. """
+    v1, v2 = batch_normalize(v1), batch_normalize(v2)
+    return np.arccos(np.clip(batch_dot(v1, v2), -1.0, 1.0))
+
+
+def batch_project_point_on_vector(proj_points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """ projects (..., 3) points on the lines through a and b.
+        A + dot(AP,AB) / dot(AB,AB) * AB """
+    ap = batch_to_vector(a, proj_points)
+    ab = batch_to_vector(a, b)
+    return a + (batch_dot(ap, ab) / batch_dot(ab, ab))[..., np.newaxis] * ab
+
+
+def batch_project_vec_from_normal(normals: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """ projects (..., 3) vectors on the planes defined by (..., 3) normals
+        by subtracting the component which is orthogonal to the plane. """
+    scale = batch_dot(vectors, normals) / batch_dot(normals, normals)
+    return vectors - scale[..., np.newaxis] * normals
+
+
+def batch_normal_from_plane(planes: np.ndarray) -> np.ndarray:
+    """ returns the (..., 3) normals of (..., 3, 3) vertex triplets. """
+    planes = np.asarray(planes)
+    return np.cross(planes[..., 1, :] - planes[..., 0, :], planes[..., 2, :] - planes[..., 0, :])
+
+
+def batch_distance_from_plane(points: np.ndarray, normals: np.ndarray, plane_points: np.ndarray) -> np.ndarray:
+    """ returns the signed distances of (..., 3) points to planes
+        defined by their normals and a point on the plane. """
+    return batch_dot(np.subtract(points, plane_points), normals)
+
+
+def batch_get_closest_idx(targets: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """ returns the indices of the closest (..., M, 3) points to the (..., 3) targets. """
+    distances = np.sum((np.asarray(points) - np.asarray(targets)[..., np.newaxis, :]) ** 2, axis=-1)
+    return np.argmin(distances, axis=-1)
+
+
+def batch_rotate_point_euler(points: np.ndarray, euler: list, origin: np.ndarray = np.array([0, 0, 0])):
+    """ returns the locations of (..., 3) points rotated counterclockwise
+        around an origin by an euler rotation in degrees (see rotate_point_euler). """
+    x, y, z = [radians(angle) for angle in euler]
+    rx = np.array([[1, 0, 0], [0, np.cos(x), -np.sin(x)], [0, np.sin(x), np.cos(x)]])
+    ry = np.array([[np.cos(y), 0, np.sin(y)], [0, 1, 0], [-np.sin(y), 0, np.cos(y)]])
+    rz = np.array([[np.cos(z), -np.sin(z), 0], [np.sin(z), np.cos(z), 0], [0, 0, 1]])
+    return (np.asarray(points) - origin) @ (rx @ ry @ rz) + origin
+
+
+# endregion
+
+
+# region batched rotations
+# Numpy equivalents of the mathutils rotation methods used by the calculators.
+# Quaternions are stored as (..., 4) arrays in (w, x, y, z) order, eulers as (..., 3) arrays in 'XYZ' order.
+# Matrices are stored as (..., 3, 3) arrays, rows as passed to generate_matrix (tangent, normal, binormal).
+def batch_quaternion_multiply(q1: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    """ returns the (..., 4) products of q1 * q2. """
+    w1, x1, y1, z1 = np.moveaxis(np.asarray(q1), -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(np.asarray(q2), -1, 0)
+    return np.stack([
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 + y1 * w2 + z1 * x2 - x1 * z2,
+        w1 * z2 + z1 * w2 + x1 * y2 - y1 * x2], axis=-1)
+
+
+def batch_quaternion_to_matrix(quaternions: np.ndarray) -> np.ndarray:
+    """ returns (..., 3, 3) rotation matrices of (..., 4) unit quaternions. """
+    w, x, y, z = np.moveaxis(np.asarray(quaternions), -1, 0)
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=-1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=-1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=-1)], axis=-2)
+
+
+def batch_euler_to_quaternion(eulers: np.ndarray) -> np.ndarray:
+    """ returns the (..., 4) quaternions of (..., 3) 'XYZ' eulers. """
+    halves = np.asarray(eulers) * .5
+    cx, cy, cz = np.moveaxis(np.cos(halves), -1, 0)
+    sx, sy, sz = np.moveaxis(np.sin(halves), -1, 0)
+    return np.stack([
+        cx * cy * cz + sx * sy * sz,
+        sx * cy * cz - cx * sy * sz,
+        cx * sy * cz + sx * cy * sz,
+        cx * cy * sz - sx * sy * cz], axis=-1)
+
+
+def batch_matrix_to_quaternion(matrices: np.ndarray) -> np.ndarray:
+    """ returns the (..., 4) rotation quaternions of (..., 3, 3) matrices
+        (equal to the rotation of generate_matrix(*matrix).decompose()). """
+    # remove the scale of the column vectors and flip negative matrices
+    matrices = np.asarray(matrices, dtype=np.float64)
+    matrices = matrices / np.linalg.norm(matrices, axis=-2, keepdims=True)
+    matrices = np.where(np.linalg.det(matrices)[..., np.newaxis, np.newaxis] < 0, -matrices, matrices)
+
+    m00, m11, m22 = matrices[..., 0, 0], matrices[..., 1, 1], matrices[..., 2, 2]
+    trace = m00 + m11 + m22
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # the quaternion gets calculated based on the largest diagonal element to keep the precision
+        s = 2.0 * np.sqrt(np.stack([1.0 + trace, 1.0 + m00 - m11 - m22, 1.0 + m11 - m00 - m22, 1.0 + m22 - m00 - m11]))
+        x_sub, y_sub, z_sub = [matrices[..., i, j] - matrices[..., j, i] for i, j in [(2, 1), (0, 2), (1, 0)]]
+        x_add, y_add, z_add = [matrices[..., i, j] + matrices[..., j, i] for i, j in [(2, 1), (0, 2), (1, 0)]]
+        candidates = np.stack([
+            np.stack([.25 * s[0], x_sub / s[0], y_sub / s[0], z_sub / s[0]], axis=-1),
+            np.stack([x_sub / s[1], .25 * s[1], z_add / s[1], y_add / s[1]], axis=-1),
+            np.stack([y_sub / s[2], z_add / s[2], .25 * s[2], x_add / s[2]], axis=-1),
+            np.stack([z_sub / s[3], y_add / s[3], x_add / s[3], .25 * s[3]], axis=-1)])
+
+    case = np.select([trace > 0, (m00 > m11) & (m00 > m22), m11 > m22], [0, 1, 2], 3)
+    quaternions = np.take_along_axis(candidates, case[np.newaxis, ..., np.newaxis], axis=0)[0]
+    # w is non-negative for a canonical result
+    quaternions = np.where(quaternions[..., :1] < 0, -quaternions, quaternions)
+    return batch_normalize(quaternions)
+
+
+def batch_decompose_matrix(matrices: np.ndarray) -> np.ndarray:
+    """ returns the inverted (..., 4) rotation quaternions of (..., 3, 3) matrices (see decompose_matrix). """
+    return batch_matrix_to_quaternion(matrices) * np.array([1, -1, -1, -1])
+
+
+def batch_compatible_euler(eulers: np.ndarray, compat: np.ndarray) -> np.ndarray:
+    """ returns the (..., 3) eulers shifted by full turns to be
+        as close as possible to the compat eulers to avoid axis flipping. """
+    pi_x2 = 2.0 * np.pi
+    # correct differences of about 360 degrees first
+    delta = eulers - compat
+    turns = np.where(np.abs(delta) > 5.1, np.floor(np.abs(delta) / pi_x2 + .5), 0)
+    eulers = eulers - np.sign(delta) * turns * pi_x2
+    delta = eulers - compat
+
+    # flip a single axis larger than 180 degrees while the others are small
+    large, small = np.abs(delta) > 3.2, np.abs(delta) < 1.6
+    others_small = np.stack([
+        small[..., 1] & small[..., 2], small[..., 2] & small[..., 0], small[..., 0] & small[..., 1]], axis=-1)
+    return eulers - np.where(large & others_small, np.sign(delta) * pi_x2, 0)
+
+
+def compatible_euler(euler: tuple, compat: tuple) -> tuple:
+    """ returns the euler shifted by full turns to be as close as possible to the compat euler.
+        Equal to batch_compatible_euler, used for scans where each euler depends on its predecessor. """
+    x, y, z = euler
+    dx, dy, dz = x - compat[0], y - compat[1], z - compat[2]
+
+    # correct differences of about 360 degrees first
+    if abs(dx) > 5.1:
+        x -= copysign(floor(abs(dx) / tau + .5) * tau, dx)
+        dx = x - compat[0]
+    if abs(dy) > 5.1:
+        y -= copysign(floor(abs(dy) / tau + .5) * tau, dy)
+        dy = y - compat[1]
+    if abs(dz) > 5.1:
+        z -= copysign(floor(abs(dz) / tau + .5) * tau, dz)
+        dz = z - compat[2]
+
+    # flip a single axis larger than 180 degrees while the others are small
+    ax, ay, az = abs(dx), abs(dy), abs(dz)
+    if ax > 3.2 and ay < 1.6 and az < 1.6:
+        x -= copysign(tau, dx)
+    if ay > 3.2 and az < 1.6 and ax < 1.6:
+        y -= copysign(tau, dy)
+    if az > 3.2 and ax < 1.6 and ay < 1.6:
+        z -= copysign(tau, dz)
+    return x, y, z
+
+
+def batch_euler_solutions(quaternions: np.ndarray) -> np.ndarray:
+    """ returns both 'XYZ' euler solutions of (..., 4) quaternions as (2, ..., 3) array. """
+    matrices = batch_quaternion_to_matrix(batch_normalize(quaternions))
+    cy = np.hypot(matrices[..., 0, 0], matrices[..., 1, 0])
+
+    eul1 = np.stack([
+        np.arctan2(matrices[..., 2, 1], matrices[..., 2, 2]),
+        np.arctan2(-matrices[..., 2, 0], cy),
+        np.arctan2(matrices[..., 1, 0], matrices[..., 0, 0])], axis=-1)
+    eul2 = np.stack([
+        np.arctan2(-matrices[..., 2, 1], -matrices[..., 2, 2]),
+        np.arctan2(-matrices[..., 2, 0], -cy),
+        np.arctan2(-matrices[..., 1, 0], -matrices[..., 0, 0])], axis=-1)
+
+    # gimbal lock
+    locked = (cy <= 16 * np.finfo(np.float32).eps)[..., np.newaxis]
+    eul_locked = np.stack([
+        np.arctan2(-matrices[..., 1, 2], matrices[..., 1, 1]),
+        eul1[..., 1], np.zeros_like(cy)], axis=-1)
+    return np.stack([np.where(locked, eul_locked, eul1), np.where(locked, eul_locked, eul2)])
+
+
+def batch_pick_euler(solutions: np.ndarray, compat: np.ndarray = None) -> np.ndarray:
+    """ returns the (..., 3) eulers from (2, ..., 3) euler solutions (see batch_euler_solutions) which are
+        compatible to the (..., 3) compat eulers if passed, otherwise the smaller solution gets picked. """
+    if compat is None:
+        eul1, eul2 = solutions
+        distance1, distance2 = np.sum(np.abs(eul1), axis=-1), np.sum(np.abs(eul2), axis=-1)
+    else:
+        eul1, eul2 = batch_compatible_euler(solutions[0], compat), batch_compatible_euler(solutions[1], compat)
+        distance1, distance2 = np.sum(np.abs(eul1 - compat), axis=-1), np.sum(np.abs(eul2 - compat), axis=-1)
+    return np.where((distance1 > distance2)[..., np.newaxis], eul2, eul1)
+
+
+def batch_quaternion_to_euler(quaternions: np.ndarray, compat: np.ndarray = None) -> np.ndarray:
+    """ returns the 'XYZ' eulers of (..., 4) quaternions. The resulting eulers are compatible
+        to the (..., 3) compat eulers if passed (see to_euler), otherwise the smaller solution gets picked. """
+    return batch_pick_euler(batch_euler_solutions(quaternions), compat)
+
+
+def batch_unwrap_eulers(quaternions: np.ndarray, compat: np.ndarray = None) -> np.ndarray:
+    """ returns continuous 'XYZ' eulers of (F, ..., 4) finite quaternion tracks along the frame axis.
+        Consecutive eulers differ by less than 180 degrees per axis, the first frame is
+        compatible to the (..., 3) compat eulers if passed, otherwise the smaller solution gets picked. """
+    solutions = batch_euler_solutions(quaternions)
+    if solutions.shape[1] == 0:
+        return solutions[0]
+
+    def wrapped_distance(eul1, eul2):
+        return np.sum(np.abs((eul1 - eul2 + np.pi) % tau - np.pi), axis=-1)
+
+    # the second solution mirrors the first, so switching the solution between frames
+    # doesn't depend on the solution picked previously and accumulates as parity
+    switch = wrapped_distance(solutions[1, 1:], solutions[0, :-1]) < wrapped_distance(solutions[0, 1:], solutions[0, :-1])
+    if compat is None:
+        first = np.sum(np.abs(solutions[1, 0]), axis=-1) < np.sum(np.abs(solutions[0, 0]), axis=-1)
+    else:
+        first = wrapped_distance(solutions[1, 0], compat) < wrapped_distance(solutions[0, 0], compat)
+    parity = np.concatenate([first[np.newaxis], first ^ (np.cumsum(switch, axis=0) % 2 == 1)])
+    eulers = np.where(parity[..., np.newaxis], solutions[1], solutions[0])
+
+    # remove full turns along the frame axis
+    eulers = np.unwrap(eulers, axis=0)
+    if compat is not None:
+        eulers = eulers + np.round((compat - eulers[0]) / tau) * tau
+    return eulers
+
+
+def batch_track_quaternion(vectors: np.ndarray, track: str = 'Z', up: str = 'Y') -> np.ndarray:
+    """ returns (..., 4) quaternions pointing the track axis along (..., 3) vectors
+        while keeping the up axis upwards (see rotate_towards). """
+    axes = ['X', 'Y', 'Z']
+    assert track.lstrip('-') in axes and up in axes and track.lstrip('-') != up, \
+        f"Invalid track {track} and up {up} axes"
+    axis, up = axes.index(track.lstrip('-')), axes.index(up)
+    vectors = np.asarray(vectors, dtype=np.float64)
+    if track.startswith('-'):
+        vectors = -vectors
+    # vectors get normalized like in rotate_towards
+    length = batch_vector_length(vectors)
+    vectors = vectors / np.where(length == 0, 1, length)[..., np.newaxis]
+    x, y, z = np.moveaxis(vectors, -1, 0)
+    zeros = np.zeros_like(x)
+
+    # rotation axis perpendicular to the track axis and the vector
+    eps = 1e-4
+    if axis == 0:
+        normal = np.stack([zeros, np.where(np.abs(y) + np.abs(z) < eps, 1.0, -z), y], axis=-1)
+    elif axis == 1:
+        normal = np.stack([z, zeros, np.where(np.abs(x) + np.abs(z) < eps, 1.0, -x)], axis=-1)
+    else:
+        normal = np.stack([np.where(np.abs(x) + np.abs(y) < eps, 1.0, -y), x, zeros], axis=-1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normal = batch_normalize(normal)
+        angle = np.arccos(np.clip(vectors[..., axis], -1.0, 1.0))
+    quaternions = np.concatenate([np.cos(angle * .5)[..., np.newaxis], normal * np.sin(angle * .5)[..., np.newaxis]], axis=-1)
+
+    if axis != up:
+        # twist around the track axis to point the up axis upwards
+        column = batch_quaternion_to_matrix(quaternions)[..., :, 2]
+        if axis == 0:
+            angle = .5 * np.arctan2(column[..., 2], column[..., 1]) if up == 1 \
+                else -.5 * np.arctan2(column[..., 1], column[..., 2])
+        elif axis == 1:
+            angle = -.5 * np.arctan2(column[..., 2], column[..., 0]) if up == 0 \
+                else .5 * np.arctan2(column[..., 0], column[..., 2])
+        else:
+            angle = .5 * np.arctan2(-column[..., 1], -column[..., 0]) if up == 0 \
+                else -.5 * np.arctan2(-column[..., 0], -column[..., 1])
+
+        twist = np.concatenate([np.cos(angle)[..., np.newaxis], vectors * np.sin(angle)[..., np.newaxis]], axis=-1)
+        quaternions = batch_quaternion_multiply(twist, quaternions)
+
+    # zero length vectors don't have a direction
+    return np.where((length == 0)[..., np.newaxis], np.array([1.0, 0, 0, 0]), quaternions)
+
+
+# endregion
 
 
 # region vector cgt_utils
@@ -13,7 +331,7 @@ def vector_length(vector: np.array):
 
 def to_vector(origin: np.array, destination: np.array):
     """ returns vector from origin to destination. """
-    return destination - origin
+    return batch_to_vector(origin, destination)
 
 
 def normalize(vector: np.array):
@@ -95,10 +413,7 @@ def project_vec_on_vec(target, destination):
 def project_point_on_vector(proj_point, a, b):
     # project vector AP onto vector AB, then add the resulting vector to point A.
     # A + dot(AP,AB) / dot(AB,AB) * AB
-    ap = to_vector(a, proj_point)
-    ab = to_vector(a, b)
-    proj = a + np.dot(ap, ab) / np.dot(ab, ab) * ab
-    return proj
+    return batch_project_point_on_vector(proj_point, a, b)
 
 
 def project_vec_on_plane(triangle: np.array, faces: np.array, vec: np.array):
@@ -137,6 +452,9 @@ def angle_between(v1: np.array, v2: np.array):
 
 def rotate_towards(origin, destination, track='Z', up='Y'):
     """ returns rotation from an origin to a destination. """
+    if rotation_backend == 'NUMPY':
+        return batch_track_quaternion(np.subtract(destination, origin), track, up)
+
     vec = Vector((destination - origin))
     vec = vec.normalized()
     quart = vec.to_track_quat(track, up)
@@ -186,9 +504,7 @@ def center_point(p1: np.array, p2: np.array):
 
 def get_closest_idx(target, points):
     """ returns the closet point to the target of an input array. """
-    distances = np.sum((points - target) ** 2, axis=1)
-    # closest = points[np.argmin(distances)]
-    return np.argmin(distances)
+    return batch_get_closest_idx(target, points)
 
 
 # endregion
@@ -370,14 +686,12 @@ def rotate_point(point, axis, angle):
 def distance_from_plane(point, normal, plane_point):
     """ returns the distance of a point to a plane using the normal
         of the plane and a random point from the plane """
-    d = np.sum(np.dot(point - plane_point, normal))
-    return d
+    return batch_distance_from_plane(point, normal, plane_point)
 
 
 def normal_from_plane(plane):
     """ get the normal from a plane """
-    normal = np.cross(plane[1] - plane[0], plane[2] - plane[0])
-    return normal
+    return batch_normal_from_plane(plane)
 
 
 # https://github.com/vladmandic/human/pull/91
@@ -399,6 +713,30 @@ def create_normal_array(vertices: np.array, faces: np.array):
 # endregion
 
 
+# region rotation backend
+# The mathutils backend returns mathutils types as required by blender. The numpy backend
+# returns arrays and runs without blender (headless), it's used if mathutils isn't available.
+ROTATION_BACKENDS = ['MATHUTILS', 'NUMPY']
+rotation_backend = 'NUMPY' if Euler is None else 'MATHUTILS'
+
+
+def set_rotation_backend(backend: str):
+    """ Selects the backend used by generate_matrix, decompose_matrix, to_euler, rotate_towards and create_euler. """
+    global rotation_backend
+    assert backend in ROTATION_BACKENDS, f"Invalid rotation backend {backend}, expected one of {ROTATION_BACKENDS}"
+    if backend == 'MATHUTILS' and Euler is None:
+        raise ModuleNotFoundError("The mathutils rotation backend requires mathutils.")
+    rotation_backend = backend
+
+
+def create_euler(angles):
+    """ returns an euler of the active rotation backend. """
+    if rotation_backend == 'NUMPY':
+        return np.array(angles, dtype=np.float64)
+    return Euler(angles)
+# endregion
+
+
 # region mathutils stuff
 # http://renderdan.blogspot.com/2006/05/rotation-matrix-from-axis-vectors.html
 def generate_matrix(tangent: np.array, normal: np.array, binormal: np.array):
@@ -406,6 +744,9 @@ def generate_matrix(tangent: np.array, normal: np.array, binormal: np.array):
     -> tangent = towards left and right [+X]
     -> normal = origin towards front [+Y]
     -> binormal = cross product of tanget and normal if +z1 [+Z] """
+    if rotation_backend == 'NUMPY':
+        return np.array([tangent, normal, binormal], dtype=np.float64)
+
     return Matrix((
         [tangent[0], tangent[1], tangent[2], 0],
         [normal[0], normal[1], normal[2], 0],
@@ -416,13 +757,27 @@ def generate_matrix(tangent: np.array, normal: np.array, binormal: np.array):
 
 def decompose_matrix(matrix: Matrix) -> (Vector, Quaternion, Vector):
     """ returns loc, quaternion, scale """
+    if rotation_backend == 'NUMPY':
+        matrix = np.asarray(matrix, dtype=np.float64)
+        loc = matrix[:3, 3] if matrix.shape[1] == 4 else np.zeros(3)
+        scale = batch_vector_length(matrix[:3, :3].T)
+        return loc, batch_decompose_matrix(matrix[:3, :3]), scale
+
     loc, quart, scale = matrix.decompose()
     quart.invert()
     return loc, quart, scale
 
 
-def to_euler(quart, combat=Euler(), space='XYZ') -> Euler:
-    """ quaternion to euler using mathutils """
+def to_euler(quart, combat=None, space='XYZ') -> Euler:
+    """ quaternion to euler using the active rotation backend, the combat defaults to (0, 0, 0) """
+    if rotation_backend == 'NUMPY':
+        assert space == 'XYZ', f"The numpy rotation backend doesn't support {space} eulers"
+        return batch_quaternion_to_euler(quart, np.zeros(3) if combat is None else np.asarray(combat))
+
+    if combat is None:
+        combat = Euler()
+    elif not isinstance(combat, Euler):
+        combat = Euler(combat)
     euler = quart.to_euler(space, combat)
     return euler
 
@@ -441,7 +796,7 @@ def quart_to_euler_combat(quart, idx, idx_offset=0, axis='XYZ', prev_rotation=No
 
 def offset_euler(euler, offset: []) -> Euler:
     """ Offsets an euler rotation using euler radians *pi. """
-    rotation = Euler((
+    rotation = create_euler((
         euler[0] + np.pi * offset[0],
         euler[1] + np.pi * offset[1],
         euler[2] + np.pi * offset[2],
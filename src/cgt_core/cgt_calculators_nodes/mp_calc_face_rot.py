@@ -1,6 +1,6 @@
 import logging
+import itertools
 import numpy as np
-from mathutils import Euler
 
 from .calc_utils import ProcessorUtils, CustomData
 from . import cgt_math
@@ -8,14 +8,30 @@ from ..cgt_patterns import cgt_nodes
 
 
 class FaceRotationCalculator(cgt_nodes.CalculatorNode, ProcessorUtils):
+    # landmark indices used to approximate the head pivot and drivers
+    pivot_indices = [447, 366, 137, 227]   # temple.R, temple.L
+    forward_indices = [1, 4]    # nose
+    right_indices = [447, 366]  # temple.R
+    down_idx = 152  # chin
+    chin_indices = [168, 2, 200]    # between eyes, nose, chin
+    mouth_indices = [61, 291, 0, 17]   # mouth corner.L, mouth corner.R, upper lip, lower lip
+
     # processed results
     def __init__(self):
+        super().__init__()
         # increase shape to add specific driver data (maybe not required for the face)
         n = 468
         self.rotation_data = []
         custom_data_arr = [CustomData(idx+n) for idx in range(0, 5)]
         self.pivot, self.chin_driver, self.left_mouth_corner, self.right_mouth_corner, *_ = custom_data_arr
 
+        # preallocated buffers which get reused every frame
+        # mesh landmarks followed by the custom data (pivot location, chin and mouth corner drivers)
+        self.buffer = np.zeros((n + len(custom_data_arr), 3), dtype=np.float32)
+        self.rotations = np.zeros((2, 3), dtype=np.float32)
+        # results as (idx, location) views of the mesh rows in the buffer
+        self.mesh_data = list(enumerate(self.buffer[:n]))
+
     def update(self, data, frame=-1):
         """ Process the landmark detection results. """
         """ Assign the data processed data to references. """
@@ -27,18 +43,27 @@ class FaceRotationCalculator(cgt_nodes.CalculatorNode, ProcessorUtils):
             logging.error(f"Index Error occurred: {data}, {frame} - check face nodes")
             return [[], [], []], frame
 
-        self.data = data[0]
-        if len(self.data) < 468:
+        if len(data[0]) < 468:
             return [[], [], []], frame
 
-        # increase the data size to hold custom data (check __init__)
-        for i in range(4):
-            self.data.append([468+i, [0., 0., 0.]])
-        self.custom_landmark_origin()
+        # write the landmarks directly to the buffer, without the idx
+        mesh = self.buffer[:468]
+        mesh.reshape(-1)[:] = np.fromiter(
+            (value for _, landmark in itertools.islice(data[0], 468) for value in landmark),
+            dtype=mesh.dtype, count=mesh.size)
 
         # get distances and rotations to determine movements
-        self.set_rotation_driver_data()
-        if self.has_duplicated_results(self.data, "face"):
+        _, rotations = self.process_frame()
+
+        # the views remain valid until the next update, results which get staged require a copy
+        self.data = self.mesh_data if self.reuse_buffers else list(enumerate(mesh.copy()))
+        self.rotation_data = [
+            [self.pivot.idx, cgt_math.create_euler(rotations[0])],
+            [self.chin_driver.idx, cgt_math.create_euler(rotations[1])],
+            # [self._mouth_corner_driver.idx, self._mouth_corner_driver.rot]
+        ]
+
+        if self.has_duplicated_results(mesh, "face"):
             return [[], [], []], frame
         return [self.data, self.rotation_data, []], frame
 
@@ -46,102 +71,99 @@ class FaceRotationCalculator(cgt_nodes.CalculatorNode, ProcessorUtils):
         """ Returns the processed data """
         return self.data, self.rotation_data, [], self.frame, self.has_duplicated_results(self.data)
 
-    def mouth_corners(self):
-        """ Calculates the angle from the mouth center to the mouth corner """
-        # center point of mouth corners gets projected on vector from upper to lower lip
-        corner_center = cgt_math.center_point(self.data[61][1], self.data[291][1])
-        projected_center = cgt_math.project_point_on_vector(corner_center, self.data[0][1], self.data[17][1])
-        # center point between upper and lower lip
-        mouth_height_center = cgt_math.center_point(self.data[0][1], self.data[17][1])
-
-        # vectors from center points to mouth corners
-        left_vec = cgt_math.to_vector(projected_center, self.data[61][1])
-        left_hv = cgt_math.to_vector(mouth_height_center, self.data[61][1])
-        right_vec = cgt_math.to_vector(projected_center, self.data[291][1])
-        right_hv = cgt_math.to_vector(mouth_height_center, self.data[291][1])
+    def process_frame(self, landmarks=None):
+        """ Processes (468, 3) landmarks of a single frame in the preallocated buffers.
+            Without landmarks, the landmarks already written to the buffer get processed.
+            Returns the (473, 3) locations and the (2, 3) head and chin rotations,
+            both get overwritten on the next call. """
+        if landmarks is not None:
+            self.buffer[:468] = landmarks
+        data = self.buffer[np.newaxis]
+        self.set_sequence_origin(data)
+        self.sequence_mouth_corners(data)
 
-        # angle between the vectors expecting users don't record upside down
-        if mouth_height_center[2] > projected_center[2]:
-            right_corner_angle = cgt_math.angle_between(left_vec, left_hv)
-            left_corner_angle = cgt_math.angle_between(right_vec, right_hv)
-        else:
-            right_corner_angle = -cgt_math.angle_between(left_vec, left_hv)
-            left_corner_angle = -cgt_math.angle_between(right_vec, right_hv)
-
-        self.left_mouth_corner.loc = [0, 0, left_corner_angle]
-        self.right_mouth_corner.loc = [0, 0, right_corner_angle]
-        self.data.append([self.left_mouth_corner.idx, self.left_mouth_corner.loc])
-        self.data.append([self.right_mouth_corner.idx, self.right_mouth_corner.loc])
-
-    def set_rotation_driver_data(self):
-        """ Get face and chin rotation """
-        self.face_mesh_rotation()
         try:
-            head_rotation = self.try_get_euler(self.pivot.rot, prev_rot_idx=self.pivot.idx)
-            # head_rotation = self.quart_to_euler_combat(self.pivot.rot, self.pivot.idx, axis='XZY')
-        except AttributeError:
-            logging.warning("Exchange method in cgt_maths for other targets than blender.")
-            head_rotation = [0, 0, 0]
-
-        self.chin_rotation()
-        chin_rotation = self.chin_driver.rot
-        # store rotation data
-        self.rotation_data = [
-            [self.pivot.idx, head_rotation],
-            [self.chin_driver.idx, chin_rotation],
-            # [self._mouth_corner_driver.idx, self._mouth_corner_driver.rot]
-        ]
-
-    def chin_rotation(self):
-        """ Calculate the chin rotation. """
+            matrix = cgt_math.generate_matrix(*self.sequence_face_matrices(data)[0])
+            _, self.pivot.rot, _ = cgt_math.decompose_matrix(matrix)
+            self.rotations[0] = self.try_get_euler(self.pivot.rot, prev_rot_idx=self.pivot.idx)
+        except (TypeError, AttributeError):
+            logging.warning("Exchange method in cgt_math for other targets than Blender.")
+            self.rotations[0] = 0
+
+        self.rotations[1] = [self.sequence_chin_angles(data)[0], 0, 0]
+        self.pivot.loc = self.buffer[self.pivot.idx]
+        return self.buffer, self.rotations
+
+    def process_sequence(self, face: np.ndarray):
+        """ Processes the landmarks of the face for all frames at once (offline data).
+            face: (F, 468, 3) landmark array
+            returns locations as (F, 473, 3) array containing the custom data (check __init__)
+            and the head and chin rotations as (F, 2, 3) array. Frames without valid landmarks are nan. """
+        face = np.asarray(face, dtype=np.float64)
+        data = np.zeros((len(face), len(self.buffer), 3))
+        data[:, :468] = face[:, :468]
+        self.set_sequence_origin(data)
+        self.sequence_mouth_corners(data)
+
+        rotations = np.full((len(data), 2, 3), np.nan)
+        rotations[:, 1] = 0
+        rotations[:, 1, 0] = self.sequence_chin_angles(data)
+
+        quaternions = cgt_math.batch_decompose_matrix(self.sequence_face_matrices(data))
+        rotations[:, 0] = self.try_get_sequence_eulers(quaternions[:, np.newaxis], [self.pivot.idx])[:, 0]
+        return data, rotations
+
+    def set_sequence_origin(self, data: np.ndarray):
+        """ Changes the x-y-z order of (F, 473, 3) data in place to match blenders coordinate system
+            and sets the face mesh position to an approximate origin based on canonical face mesh geometry.
+            The approximated origin gets stored as pivot location. """
+        mesh = data[:, :468]
+        mesh[:, :, 1:] = mesh[:, :, 2:0:-1]
+        mesh[:, :, [0, 2]] *= -1
+
+        pivot = data[:, self.pivot.idx]
+        np.mean(mesh[:, self.pivot_indices], axis=1, out=pivot)
+        mesh -= pivot[:, np.newaxis]
+
+    def sequence_face_matrices(self, data: np.ndarray):
+        """ Returns (F, 3, 3) matrices of centered face data approximating the face rotation. """
+        forward_point = np.mean(data[:, self.forward_indices], axis=1)
+        right_point = np.mean(data[:, self.right_indices], axis=1)
+        down_point = data[:, self.down_idx]
+
+        # direction vectors from imaginary origin (tangent, normal, binormal)
+        return cgt_math.batch_normalize(np.stack([right_point, forward_point, down_point], axis=1))
+
+    def sequence_chin_angles(self, data: np.ndarray):
+        """ Returns (F, ) chin x-rotation of centered face data. """
         # draw vector from point between eyes to mouth and chin
-        nose_dir = cgt_math.to_vector(self.data[168][1], self.data[2][1])
-        chin_dir = cgt_math.to_vector(self.data[168][1], self.data[200][1])
-
-        # calculate the Z rotation
-        nose_dir_z, chin_dir_z = cgt_math.null_axis([nose_dir, chin_dir], 'X')
-        z_angle = cgt_math.angle_between(nose_dir_z, chin_dir_z) * 1.8
+        center, nose, chin = [data[:, idx] for idx in self.chin_indices]
+        directions = np.stack([nose - center, chin - center], axis=1)
 
-        # in the detection results is no X-rotation available
-        # nose_dir_x, chin_dir_x = m_V.null_axis([nose_dir, chin_dir], 'Z')
-        # chin_rotation = m_V.rotate_towards(self.data[152][1], self.data[6][1], 'Y', 'Z')
+        # calculate the Z rotation, in the detection results is no X-rotation available
+        directions[:, :, 0] = 0
+        z_angle = cgt_math.batch_angle_between(directions[:, 0], directions[:, 1]) * 1.8
 
         # due to the base angle it's required to offset the rotation
-        self.chin_driver.rot = Euler(((z_angle - 3.14159 * .07) * 1.175, 0, 0))
-
-    def face_mesh_rotation(self):
-        """ Calculate face quaternion using
-            points to approximate the transformation matrix. """
-        origin = np.array([0, 0, 0])
+        return (z_angle - 3.14159 * .07) * 1.175
 
-        forward_point = cgt_math.center_point(np.array(self.data[1][1]), np.array(self.data[4][1]))  # nose
-        right_point = cgt_math.center_point(np.array(self.data[447][1]), np.array(self.data[366][1]))  # temple.R
-        down_point = np.array(self.data[152][1])  # chin
+    def sequence_mouth_corners(self, data: np.ndarray):
+        """ Calculates the angle from the mouth center to the mouth corners
+            and stores them as z-location of the mouth corner drivers. """
+        left, right, upper, lower = [data[:, idx] for idx in self.mouth_indices]
 
-        # direction vectors from imaginary origin
-        normal = cgt_math.normalize(cgt_math.to_vector(origin, forward_point))
-        tangent = cgt_math.normalize(cgt_math.to_vector(origin, right_point))
-        binormal = cgt_math.normalize(cgt_math.to_vector(origin, down_point))
+        # center point of mouth corners gets projected on vector from upper to lower lip
+        corner_center = cgt_math.center_point(left, right)
+        projected_center = cgt_math.batch_project_point_on_vector(corner_center, upper, lower)
+        # center point between upper and lower lip
+        mouth_height_center = cgt_math.center_point(upper, lower)
 
-        # generate matrix to decompose it and access quaternion rotation
-        try:
-            matrix = cgt_math.generate_matrix(tangent, normal, binormal)
-            loc, quart, scale = cgt_math.decompose_matrix(matrix)
-        except TypeError:
-            logging.warning("Exchange method in cgt_math for other targets than Blender.")
-            quart = None
-        self.pivot.rot = quart
-
-    # region cgt_utils
-    def custom_landmark_origin(self):
-        """ Sets face mesh position to approximate origin """
-        self.data = [[idx, np.array([-lmrk[0], lmrk[2], -lmrk[1]])] for idx, lmrk in self.data[:468]]
-        self.approximate_pivot_location()
-        self.data = [[idx, np.array(lmrk) - np.array(self.pivot.loc)] for idx, lmrk in self.data[:468]]
-
-    def approximate_pivot_location(self):
-        """ Sets to approximate origin based on canonical face mesh geometry """
-        right = cgt_math.center_point(np.array(self.data[447][1]), np.array(self.data[366][1]))  # temple.R
-        left = cgt_math.center_point(np.array(self.data[137][1]), np.array(self.data[227][1]))  # temple.L
-        self.pivot.loc = cgt_math.center_point(right, left)  # approximate origin
-    # endregion
+        # angle between the vectors expecting users don't record upside down
+        right_corner_angle = cgt_math.batch_angle_between(left - projected_center, left - mouth_height_center)
+        left_corner_angle = cgt_math.batch_angle_between(right - projected_center, right - mouth_height_center)
+        sign = np.where(mouth_height_center[:, 2] > projected_center[:, 2], 1, -1)
+
+        data[:, self.left_mouth_corner.idx] = 0
+        data[:, self.right_mouth_corner.idx] = 0
+        data[:, self.left_mouth_corner.idx, 2] = sign * left_corner_angle
+        data[:, self.right_mouth_corner.idx, 2] = sign * right_corner_angle
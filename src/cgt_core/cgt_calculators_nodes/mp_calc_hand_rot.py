@@ -23,6 +23,15 @@ class HandRotationCalculator(cgt_nodes.CalculatorNode, calc_utils.ProcessorUtils
     left_scale: np.ndarray = None
     right_scale: np.ndarray = None
 
+    # finger z-angle method: 'CIRCLE' searches sampled circle points, 'PROJECTION' is closed-form
+    z_angle_modes = ['CIRCLE', 'PROJECTION']
+    z_angle_mode: str = 'CIRCLE'
+
+    def __init__(self, z_angle_mode: str = 'CIRCLE'):
+        super().__init__()
+        assert z_angle_mode in self.z_angle_modes
+        self.z_angle_mode = z_angle_mode
+
     def init_data(self):
         """ Process and map received data from mediapipe before key-framing. """
         self.left_hand_data = self.set_global_origin(self.data[0])
@@ -81,6 +90,10 @@ class HandRotationCalculator(cgt_nodes.CalculatorNode, calc_utils.ProcessorUtils
             Searching for the closest point on the circle to the fingers dip and calculate the angle.
             Thumb gets projected on a plane between thumb mcp, index mcp and wrist to calculate the z-angle.
         """
+        if self.z_angle_mode == 'PROJECTION':
+            hands = np.array([landmark for _, landmark in hand[:21]])[np.newaxis]
+            return list(self.get_sequence_z_angles(hands)[0, :20])
+
         data = [0] * 20
         joints = np.array([[0, 1, 2]])
 
@@ -218,6 +231,137 @@ class HandRotationCalculator(cgt_nodes.CalculatorNode, calc_utils.ProcessorUtils
 
         return hand_rotation
 
+    # region sequence processing
+    def process_sequence(self, hand: np.ndarray, orientation: str = "R"):
+        """ Processes the landmarks of a hand for all frames at once (offline data).
+            hand: (F, 21, 3) landmark array
+            returns locations and angles as (F, 21, 3) arrays,
+            the global hand rotation gets stored at the wrist index (0). """
+        hand = np.asarray(hand, dtype=np.float64)
+        locations = self.set_sequence_global_origin(hand)
+
+        angles = np.zeros(locations.shape)
+        angles[:, :, 0] = self.get_sequence_x_angles(locations)
+        angles[:, :, 2] = self.get_sequence_z_angles(locations)
+
+        combat_idx_offset = 100 if orientation == "R" else 0
+        angles[:, 0] = self.sequence_hand_rotation(locations, combat_idx_offset, orientation)
+        return locations, angles
+
+    def get_sequence_x_angles(self, hands: np.ndarray):
+        """ Get finger x angles of (F, 21, 3) hands, see get_x_angles. """
+        indices = np.array([range(mcp, tip) for mcp, tip in self.fingers])
+
+        # add the wrist as origin to all fingers and straighten them by plane projection
+        fingers = np.zeros((len(hands), 5, 5, 3))
+        fingers[:, :, 1:] = hands[:, indices]
+        normals = np.cross(fingers[:, :, 1], fingers[:, :, 4])
+        fingers = cgt_math.batch_project_vec_from_normal(normals[:, :, np.newaxis], fingers)
+
+        # angles between the bones of each joint
+        bones = np.diff(fingers, axis=2)
+        x_angles = cgt_math.batch_angle_between(bones[:, :, :-1], bones[:, :, 1:])
+
+        data = np.zeros(hands.shape[:2])
+        data[:, indices[:, :3]] = x_angles
+        return data
+
+    def get_sequence_z_angles(self, hands: np.ndarray):
+        """ Get finger z angles of (F, 21, 3) hands, see get_z_angles. """
+        data = np.zeros(hands.shape[:2])
+
+        # thumb gets projected on the plane between wrist, thumb mcp and index mcp
+        normals = np.cross(hands[:, 1], hands[:, 5])[:, np.newaxis]
+        thumb_proj = cgt_math.batch_project_vec_from_normal(normals, hands[:, [1, 5, 2]])
+        data[:, 1] = cgt_math.batch_angle_between(
+            thumb_proj[:, 1] - thumb_proj[:, 0], thumb_proj[:, 2] - thumb_proj[:, 0])
+
+        # mcps projected on tangent, pips and their dists
+        mcp_idx = [mcp for mcp, _ in self.fingers[1:]]
+        pip_idx = [tip - 2 for _, tip in self.fingers[1:]]
+        tangent = cgt_math.batch_to_vector(hands[:, 5], hands[:, 17])
+        mcps = cgt_math.batch_project_point_on_vector(
+            hands[:, mcp_idx], hands[:, np.newaxis, 5], hands[:, np.newaxis, 17])
+        pips = hands[:, pip_idx]
+        dists = cgt_math.batch_vector_length(pips - mcps)
+
+        # circle direction vectors related to the hand
+        pinky_vec = cgt_math.batch_to_vector(hands[:, 0], hands[:, 17])
+        thumb_vec = cgt_math.batch_to_vector(hands[:, 1], hands[:, 5])
+        dirs = np.stack([pinky_vec, pinky_vec, thumb_vec, thumb_vec], axis=1)
+
+        # axes of circles around the tangent in target dir, see create_circle_around_vector
+        u = cgt_math.batch_normalize(dirs)
+        v = cgt_math.batch_normalize(np.cross(tangent[:, np.newaxis], dirs))
+
+        if self.z_angle_mode == 'PROJECTION':
+            data[:, mcp_idx] = self.projected_z_angles(pips - mcps, u, v)
+        else:
+            data[:, mcp_idx] = self.sampled_z_angles(pips, mcps, dists, u, v)
+        return data
+
+    @staticmethod
+    def projected_z_angles(mcp_pips: np.ndarray, u: np.ndarray, v: np.ndarray):
+        """ Closed-form equivalent of sampled_z_angles without quantization.
+            Projects the mcp-pip vectors on the circle plane spanned by u and v
+            and returns the signed angles between the vectors and their projection. """
+        normals = np.cross(u, v)
+        in_plane = np.hypot(cgt_math.batch_dot(mcp_pips, u), cgt_math.batch_dot(mcp_pips, v))
+        return np.arctan2(-cgt_math.batch_dot(mcp_pips, normals), in_plane)
+
+    @staticmethod
+    def sampled_z_angles(pips: np.ndarray, mcps: np.ndarray, dists: np.ndarray, u: np.ndarray, v: np.ndarray):
+        """ Searches the closest point to the pips on sampled circles around the mcps
+            and returns the signed angles between the mcp-pip and mcp-closest vectors. """
+        # circles (F, 4, points, 3) with the mcp-pip distance as radius
+        points = 20
+        theta = np.linspace(0, np.pi * 2, points)
+        radius = dists[..., np.newaxis, np.newaxis]
+        circles = (mcps[:, :, np.newaxis]
+                   + radius * u[:, :, np.newaxis] * np.cos(theta)[:, np.newaxis]
+                   + radius * v[:, :, np.newaxis] * np.sin(theta)[:, np.newaxis])
+
+        # closest point on circle to the pip and a triangle facing it
+        closest = cgt_math.batch_get_closest_idx(pips, circles)
+        frames, fingers = np.indices(closest.shape)
+        closest_points = circles[frames, fingers, closest]
+        a = circles[frames, fingers, (closest + 6) % points]
+        b = circles[frames, fingers, (closest - 6) % points]
+
+        # signed angle based on the distance from the triangle to the pip
+        normals = cgt_math.batch_normalize(
+            cgt_math.batch_normal_from_plane(np.stack([a, closest_points, b], axis=2)))
+        dist = cgt_math.batch_distance_from_plane(pips, normals, closest_points)
+        angles = cgt_math.batch_angle_between(pips - mcps, closest_points - mcps)
+        return np.where(dist < 0, -angles, angles)
+
+    def sequence_hand_rotation(self, hands: np.ndarray, combat_idx_offset: int = 0, orientation: str = "R"):
+        """ Calculates approximate hand rotations of (F, 21, 3) hands, see global_hand_rotation.
+            Returns (F, 3) eulers, frames without valid landmarks are nan. """
+        # default hand rotation for a rigify A-Pose rig,
+        if orientation == "R":
+            rotation = [-60, 60, 0]
+        else:
+            rotation = [-60, -60, 0]
+
+        # setup vectors to create matrices
+        rotated_points = cgt_math.batch_rotate_point_euler(hands[:, [1, 5, 13]], rotation)
+        tangent = cgt_math.batch_normalize(rotated_points[:, 1] - rotated_points[:, 0])
+        binormal = cgt_math.batch_normalize(rotated_points[:, 2] - rotated_points[:, 1])
+        normal = cgt_math.batch_normalize(np.cross(binormal, tangent))
+        matrices = np.stack([normal, tangent, binormal], axis=1)
+
+        quaternions = cgt_math.batch_decompose_matrix(matrices)
+        return self.try_get_sequence_eulers(quaternions[:, np.newaxis], [combat_idx_offset])[:, 0]
+
+    @staticmethod
+    def set_sequence_global_origin(hands: np.ndarray):
+        """ Sets the wrist of (F, 21, 3) hands to (0, 0, 0) and
+            changes the x-y-z order to match blenders coordinate system. """
+        hands = hands[:, :, [0, 2, 1]] * np.array([-1, 1, -1])
+        return hands - hands[:, :1]
+    # endregion
+
     def landmarks_to_hands(self, left_hand, right_hand):
         """ Determines to which hand the landmark data belongs """
         left_hand = self.set_global_origin(left_hand)
@@ -1,5 +1,4 @@
 import numpy as np
-from mathutils import Euler
 from typing import List
 from . import calc_utils, cgt_math
 from ..cgt_patterns import cgt_nodes
@@ -9,10 +8,18 @@ class PoseRotationCalculator(cgt_nodes.CalculatorNode, calc_utils.ProcessorUtils
     shoulder_center = None
     hip_center = None
 
-    rotation_data = []
-    scale_data = []
+    rotation_data: list = None
+    scale_data: list = None
+
+    # ik chains (left leg, right leg, right arm, left arm) and
+    # the landmark indices of the rotations in order of calculation
+    limb_chains = [[23, 25, 27], [24, 26, 28], [12, 14, 16, 20], [11, 13, 15, 19]]
+    rotation_indices = [34, 33] + [idx for chain in limb_chains for idx in chain[:-1]] + [27, 28]
 
     def __init__(self):
+        super().__init__()
+        self.rotation_data = []
+        self.scale_data = []
         self.shoulder_center = calc_utils.CustomData(34)
         self.pose_offset = calc_utils.CustomData(35)
         self.hip_center = calc_utils.CustomData(33)
@@ -141,9 +148,9 @@ class PoseRotationCalculator(cgt_nodes.CalculatorNode, calc_utils.ProcessorUtils
         hip_rot = self.try_get_euler(hip_rotation, offset, 8)
 
         # offset between hip & shoulder rot = real shoulder rot
-        euler = Euler((shoulder_rot[0] - hip_rot[0],
-                       shoulder_rot[1] - hip_rot[1],
-                       shoulder_rot[2] - hip_rot[2]))
+        euler = cgt_math.create_euler((shoulder_rot[0] - hip_rot[0],
+                                       shoulder_rot[1] - hip_rot[1],
+                                       shoulder_rot[2] - hip_rot[2]))
         self.rotation_data.append([self.shoulder_center.idx, euler])
 
     def shoulder_hip_location(self):
@@ -166,3 +173,63 @@ class PoseRotationCalculator(cgt_nodes.CalculatorNode, calc_utils.ProcessorUtils
                                      landmark[2] - self.hip_center.loc[2]])]
                      for idx, landmark in self.data]
         self.data.append([self.pose_offset.idx, self.pose_offset.loc])
+
+    # region sequence processing
+    def process_sequence(self, pose: np.ndarray):
+        """ Processes the landmarks of the pose for all frames at once (offline data).
+            pose: (F, 33, 3) landmark array
+            returns locations as (F, 36, 3) array containing the custom data (check __init__)
+            and rotations as (F, K, 3) array ordered like `rotation_indices`. """
+        pose = np.asarray(pose, dtype=np.float64)
+        locations = self.set_sequence_hip_as_origin(pose)
+        rotations = self.sequence_rotations(locations)
+        return locations, rotations
+
+    def sequence_rotations(self, data: np.ndarray):
+        """ Calculates the rotations of (F, 36, 3) centered pose locations, see calculate_rotations.
+            Frames without valid landmarks are nan. """
+        shoulder_center = cgt_math.center_point(data[:, 11], data[:, 12])
+        hip_center = cgt_math.center_point(data[:, 23], data[:, 24])
+
+        # torso matrices from the plane connecting hips and the shoulder center
+        torso_normal = cgt_math.batch_normal_from_plane(np.stack([data[:, 23], data[:, 24], shoulder_center], axis=1))
+        torso_matrices = cgt_math.batch_normalize(np.stack([
+            data[:, 24] - hip_center, shoulder_center - hip_center, torso_normal], axis=1))
+
+        # foot matrices from knee, ankle & foot_index
+        foot_locations = np.stack([data[:, [25, 26]], data[:, [27, 28]], data[:, [31, 32]]], axis=2)
+        foot_matrices = cgt_math.batch_normalize(np.stack([
+            cgt_math.batch_normal_from_plane(foot_locations),
+            foot_locations[:, :, 1] - foot_locations[:, :, 2],
+            foot_locations[:, :, 0] - foot_locations[:, :, 2]], axis=2))
+
+        # chain rotations point from each landmark towards its predecessor
+        chain_targets = [idx for chain in self.limb_chains for idx in chain[:-1]]
+        chain_origins = [idx for chain in self.limb_chains for idx in chain[1:]]
+
+        # shoulder & hip, torso, limb chain and foot rotations with their combat indices
+        quaternions = np.concatenate([
+            cgt_math.batch_track_quaternion(data[:, [12, 24]] - np.stack([shoulder_center, hip_center], axis=1), 'Z'),
+            cgt_math.batch_decompose_matrix(torso_matrices)[:, np.newaxis],
+            cgt_math.batch_track_quaternion(data[:, chain_targets] - data[:, chain_origins], '-Y', 'Z'),
+            cgt_math.batch_decompose_matrix(foot_matrices)], axis=1)
+        prev_rot_indices = [7, 8, self.hip_center.idx] + chain_targets + [27, 28]
+        offsets = [[0, 0, 0], [0, 0, 0], [-.5, 0, 0]] + [None] * (len(chain_targets) + 2)
+        eulers = self.try_get_sequence_eulers(quaternions, prev_rot_indices, offsets)
+
+        # offset between hip & shoulder rot = real shoulder rot
+        return np.concatenate([(eulers[:, 0] - eulers[:, 1])[:, np.newaxis], eulers[:, 2:]], axis=1)
+
+    def set_sequence_hip_as_origin(self, pose: np.ndarray):
+        """ Changes the x-y-z order of (F, 33, 3) landmarks to match blenders coordinate system,
+            sets the hip center as origin and appends the custom data (check __init__). """
+        data = np.zeros((len(pose), 36, 3))
+        data[:, :33] = pose[:, :, [0, 2, 1]] * np.array([-1, 1, -1])
+
+        hip_center = cgt_math.center_point(data[:, 23], data[:, 24])
+        data[:, self.hip_center.idx] = hip_center
+        data[:, self.shoulder_center.idx] = cgt_math.center_point(data[:, 11], data[:, 12])
+        data[:, :35] -= hip_center[:, np.newaxis]
+        data[:, self.pose_offset.idx] = hip_center
+        return data
+    # endregion
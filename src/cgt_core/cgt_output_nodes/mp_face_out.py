@@ -10,6 +10,7 @@ class MPFaceOutputNode(mp_out_utils.BpyOutputNode):
     parent_col = COLLECTIONS.drivers
 
     def __init__(self):
+        super().__init__()
         data = cgt_defaults
 
         references = {}
@@ -32,5 +33,6 @@ class MPFaceOutputNode(mp_out_utils.BpyOutputNode):
                 method(self.face, data, frame)
             except IndexError:
                 pass
+        self.keyframes.step()
         return data, frame
 
@@ -11,6 +11,7 @@ class CgtMPHandOutNode(mp_out_utils.BpyOutputNode):
     parent_col = COLLECTIONS.drivers
 
     def __init__(self):
+        super().__init__()
         data = cgt_defaults
         references = data.hand
         self.left_hand = cgt_bpy_utils.add_empties(references, 0.005, prefix=".L", suffix='cgt_')
@@ -37,4 +38,5 @@ class CgtMPHandOutNode(mp_out_utils.BpyOutputNode):
                     method(hand, chunk, frame)
                 except IndexError:
                     pass
+        self.keyframes.step()
         return data, frame
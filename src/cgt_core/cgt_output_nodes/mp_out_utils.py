@@ -8,45 +8,58 @@ import bpy.types
 from ..cgt_naming import COLLECTIONS
 from mathutils import Vector, Quaternion, Euler
 from ..cgt_patterns import cgt_nodes
+from ..cgt_bpy import cgt_fc_actions
 
 
 class BpyOutputNode(cgt_nodes.OutputNode):
     parent_col = COLLECTIONS.drivers
-    prev_rotation = {}
+    prev_rotation: dict = None
+    keyframes: cgt_fc_actions.KeyframeWriter = None
+    # frames accumulated before keyframes get written to the f-curves
+    flush_step: int = 16
+
+    def __init__(self):
+        self.keyframes = cgt_fc_actions.KeyframeWriter(self.flush_step)
+        self.reset()
+
+    def reset(self):
+        """ Resets the previously keyframed rotations. """
+        self.prev_rotation = {}
 
     @abstractmethod
     def update(self, data, frame):
         pass
 
-    @staticmethod
-    def translate(target: List[bpy.types.Object], data, frame: int):
+    def flush(self):
+        """ Writes the accumulated keyframes. """
+        self.keyframes.flush()
+
+    def translate(self, target: List[bpy.types.Object], data, frame: int):
         """ Translates and keyframes bpy empty objects. """
         try:
             for landmark in data:
                 target[landmark[0]].location = Vector((landmark[1]))
-                target[landmark[0]].keyframe_insert(data_path="location", frame=frame)
+                self.keyframes.add(target[landmark[0]], "location", frame, landmark[1])
 
         except IndexError:
             logging.debug(f"missing translation index at {frame}")
             pass
 
-    @staticmethod
-    def scale(target, data, frame):
+    def scale(self, target, data, frame):
         try:
             for landmark in data:
                 target[landmark[0]].scale = Vector((landmark[1]))
-                target[landmark[0]].keyframe_insert(data_path="scale", frame=frame)
+                self.keyframes.add(target[landmark[0]], "scale", frame, landmark[1])
         except IndexError:
             logging.debug(f"missing scale index at {data}, {frame}")
             pass
 
-    @staticmethod
-    def quaternion_rotate(target, data, frame):
+    def quaternion_rotate(self, target, data, frame):
         """ Translates and keyframes bpy empty objects. """
         try:
             for landmark in data:
                 target[landmark[0]].rotation_quaternion = landmark[1]
-                target[landmark[0]].keyframe_insert(data_path="rotation_quaternion", frame=frame)
+                self.keyframes.add(target[landmark[0]], "rotation_quaternion", frame, landmark[1])
         except IndexError:
             logging.debug(f"missing quat_euler_rotate index {data}, {frame}")
             pass
@@ -56,7 +69,7 @@ class BpyOutputNode(cgt_nodes.OutputNode):
         try:
             for landmark in data:
                 target[landmark[0]].rotation_euler = landmark[1]
-                target[landmark[0]].keyframe_insert(data_path="rotation_euler", frame=frame)
+                self.keyframes.add(target[landmark[0]], "rotation_euler", frame, landmark[1])
                 self.prev_rotation[landmark[0] + idx_offset] = landmark[1]
         except IndexError:
             logging.debug(f"missing euler_rotate index at {data}, {frame}")
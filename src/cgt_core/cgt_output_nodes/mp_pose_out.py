@@ -10,6 +10,7 @@ class MPPoseOutputNode(mp_out_utils.BpyOutputNode):
     parent_col = COLLECTIONS.drivers
 
     def __init__(self):
+        super().__init__()
         data = cgt_defaults
         references = {}
         for k, v in data.pose.items():
@@ -28,5 +29,6 @@ class MPPoseOutputNode(mp_out_utils.BpyOutputNode):
                 method(self.pose, data, frame)
             except IndexError:
                 pass
+        self.keyframes.step()
         return data, frame
 
@@ -0,0 +1,81 @@
+from __future__ import annotations
+from typing import Any, List, Optional, Tuple
+import threading
+import logging
+import queue
+
+from .cgt_nodes import Node, calculator_nodes
+
+
+class NodeWorker(threading.Thread):
+    """ Updates a node (chain) on a background thread and stages the results in a queue.
+        Input nodes pull their data, so the worker updates with empty data and increases the frame by key_step.
+        Stops if the node returns None, the results queue receives None in this case. """
+    results: queue.Queue
+
+    def __init__(self, node: Node, frame: int = 0, key_step: int = 1, maxsize: int = 64):
+        super().__init__(name="cgt_node_worker", daemon=True)
+        self.node = node
+        # results get staged in the queue, so calculators may not reuse their buffers
+        for calculator in calculator_nodes(node):
+            calculator.reuse_buffers = False
+        self.frame = frame
+        self.key_step = key_step
+        self.results = queue.Queue(maxsize)
+        self.running = threading.Event()
+        self.running.set()
+
+    def run(self):
+        try:
+            while self.running.is_set():
+                data, frame = self.node.update([], self.frame)
+                if data is None:
+                    break
+
+                # wait while the results queue is full
+                while self.running.is_set():
+                    try:
+                        self.results.put((data, frame), timeout=.1)
+                        break
+                    except queue.Full:
+                        continue
+                self.frame += self.key_step
+        except Exception as e:
+            logging.error(f"Node worker stopped: {e}")
+            raise
+        finally:
+            self.put_finished()
+            self.running.clear()
+
+    def put_finished(self):
+        """ Stages None to mark the end of the results.
+            Once stopped, staged results may get replaced as nobody awaits them. """
+        while True:
+            try:
+                self.results.put(None, timeout=.1)
+                return
+            except queue.Full:
+                if self.running.is_set():
+                    continue
+                try:
+                    self.results.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def drain(self, max_items: int = None) -> Tuple[List[Tuple[Any, int]], bool]:
+        """ Returns the staged results without blocking and whether the worker finished. """
+        items = []
+        while max_items is None or len(items) < max_items:
+            try:
+                item = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def stop(self, timeout: Optional[float] = 2.):
+        self.running.clear()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
@@ -81,6 +81,10 @@ class InputNode(Node):
 
 class CalculatorNode(Node):
     """ Calculate new data and changes the input shape. """
+    # results may be views of buffers which get reused on the next update,
+    # disable when results get staged before they are output
+    reuse_buffers: bool = True
+
     @abstractmethod
     def update(self, data: Any, frame: int) -> Tuple[Optional[Any], int]:
         pass
@@ -91,3 +95,59 @@ class OutputNode(Node):
     @abstractmethod
     def update(self, data: Any, frame: int) -> Tuple[Optional[Any], int]:
         pass
+
+    def flush(self):
+        """ Writes pending output, called once the chain stops updating. """
+        pass
+
+
+def output_nodes(node: Node) -> List[OutputNode]:
+    """ Returns the output nodes of a node (chain) in update order. """
+    if isinstance(node, OutputNode):
+        return [node]
+    if isinstance(node, (NodeChain, NodeChainGroup)):
+        return [output_node for sub_node in node.nodes for output_node in output_nodes(sub_node)]
+    return []
+
+
+def calculator_nodes(node: Node) -> List[CalculatorNode]:
+    """ Returns the calculator nodes of a node (chain) in update order. """
+    if isinstance(node, CalculatorNode):
+        return [node]
+    if isinstance(node, (NodeChain, NodeChainGroup)):
+        return [calculator_node for sub_node in node.nodes for calculator_node in calculator_nodes(sub_node)]
+    return []
+
+
+def flush_output_nodes(node: Node):
+    """ Flushes the pending output of all output nodes in a node (chain). """
+    for output_node in output_nodes(node):
+        output_node.flush()
+
+
+def split_output_nodes(node: Node) -> Tuple[Optional[Node], Optional[Node]]:
+    """ Splits a node (chain) in a part without and a part only containing output nodes,
+        so both parts can be updated separately (e.g. output nodes on blenders main thread).
+        Chain groups keep their shape, chains without output nodes get replaced by empty chains. """
+    if isinstance(node, OutputNode):
+        return None, node
+
+    if isinstance(node, NodeChainGroup):
+        calculator_group, output_group = NodeChainGroup(), NodeChainGroup()
+        for node_chain in node.nodes:
+            calculator_chain, output_chain = split_output_nodes(node_chain)
+            calculator_group.nodes.append(calculator_chain if calculator_chain is not None else NodeChain())
+            output_group.nodes.append(output_chain if output_chain is not None else NodeChain())
+        return calculator_group, output_group
+
+    if isinstance(node, NodeChain):
+        calculator_chain, output_chain = NodeChain(), NodeChain()
+        for sub_node in node.nodes:
+            calculator_node, output_node = split_output_nodes(sub_node)
+            if calculator_node is not None:
+                calculator_chain.append(calculator_node)
+            if output_node is not None:
+                output_chain.append(output_node)
+        return calculator_chain, output_chain
+
+    return node, None
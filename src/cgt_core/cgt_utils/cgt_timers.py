@@ -1,7 +1,7 @@
 from __future__ import annotations
 from functools import wraps
-from time import time
-from typing import Callable
+from time import time, perf_counter
+from typing import Callable, Dict, Optional
 from collections import deque
 
 
@@ -44,3 +44,76 @@ def fps(func: Callable):
         return res
 
     return wrap
+
+
+class FrameClock:
+    """ Maps wall-clock capture timestamps to timeline frames, so recorded animation stays in real time
+        when detection can't keep up. The first captured frame maps to the start frame.
+        Frames closer than key_step to the last frame are considered stale and should be dropped before detection.
+        Measures the end-to-end latency from capture to applied results and the key frame throughput. """
+    def __init__(self, fps: float, start_frame: int = 0, key_step: int = 1, smoothing: float = .1):
+        self.fps = fps
+        self.start_frame = start_frame
+        self.key_step = max(1, key_step)
+        self.smoothing = smoothing
+        self.start_time: Optional[float] = None
+        self.last_frame: Optional[int] = None
+        self.last_time: Optional[float] = None
+        self.captured: Dict[int, float] = {}
+
+        # moving averages in seconds
+        self.latency: Optional[float] = None
+        self.interval: Optional[float] = None
+        self.max_latency = 0.
+        self.frames = 0
+
+    def next_timestamp(self) -> Optional[float]:
+        """ Earliest capture time of the next key frame, None until the first frame. """
+        if self.start_time is None:
+            return None
+        return self.start_time + (self.last_frame - self.start_frame + self.key_step - .5) / self.fps
+
+    def frame(self, timestamp: float) -> int:
+        """ Timeline frame of a capture timestamp, frames increase strictly. """
+        if self.start_time is None:
+            self.start_time = timestamp
+            frame = self.start_frame
+        else:
+            frame = self.start_frame + round((timestamp - self.start_time) * self.fps)
+            frame = max(frame, self.last_frame + 1)
+            self.interval = self.average(self.interval, timestamp - self.last_time)
+
+        self.last_frame, self.last_time = frame, timestamp
+        self.captured[frame] = timestamp
+        return frame
+
+    def record(self, frame: int, now: float = None):
+        """ Records the latency of a frame once its results got applied. """
+        timestamp = self.captured.pop(frame, None)
+        if timestamp is None:
+            return
+        latency = (perf_counter() if now is None else now) - timestamp
+        self.latency = self.average(self.latency, latency)
+        self.max_latency = max(self.max_latency, latency)
+        self.frames += 1
+
+    def average(self, value: Optional[float], sample: float) -> float:
+        if value is None:
+            return sample
+        return value + self.smoothing * (sample - value)
+
+    @property
+    def throughput(self) -> float:
+        """ Key frames per second. """
+        return 0. if not self.interval else 1. / self.interval
+
+    @property
+    def effective_key_step(self) -> float:
+        """ Average timeline frames between key frames. """
+        return self.key_step if self.interval is None else self.interval * self.fps
+
+    def __str__(self):
+        latency = 0. if self.latency is None else self.latency
+        return (f"{self.frames} frames at {round(self.throughput, 2)} fps, "
+                f"key step: {round(self.effective_key_step, 2)}, "
+                f"latency: {round(latency * 1000, 1)} ms (max {round(self.max_latency * 1000, 1)} ms)")
@@ -3,6 +3,7 @@ import logging
 import addon_utils
 from pathlib import Path
 from . import fm_utils, fm_session_loader
+from ..cgt_core.cgt_patterns import cgt_nodes
 
 
 class OT_Freemocap_Quickload_Operator(bpy.types.Operator):
@@ -100,6 +101,8 @@ class WM_Load_Freemocap_Operator(bpy.types.Operator):
     def cancel(self, context):
         """ Upon finishing detection clear time and remove manager. """
         self.user.modal_active = False
+        if self.session_loader is not None:
+            cgt_nodes.flush_output_nodes(self.session_loader.node_chain)
         wm = context.window_manager
         wm.event_timer_remove(self._timer)
         logging.debug("FINISHED DETECTION")
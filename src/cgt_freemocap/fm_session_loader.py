@@ -8,10 +8,12 @@ from ..cgt_core.cgt_calculators_nodes import mp_calc_face_rot, mp_calc_pose_rot,
 from ..cgt_core.cgt_utils.cgt_timers import timeit
 from ..cgt_core.cgt_utils.cgt_json import JsonData
 from ..cgt_core.cgt_output_nodes import mp_hand_out, mp_face_out, mp_pose_out
+from .fm_skeleton_data import SkeletonData
 
 
 class FreemocapLoader:
-    mediapipe3d_frames_trackedPoints_xyz: np.array = None
+    mediapipe3d_frames_trackedPoints_xyz: SkeletonData = None
+    mediapipe3d_frames_trackedPoints_reprojectionError: np.ndarray = None
     number_of_frames: int = -1
     number_of_tracked_points: int = -1
 
@@ -35,19 +37,20 @@ class FreemocapLoader:
         mediapipe3d_xyz_npy_path = data_arrays_path / 'mediaPipeSkel_3d_smoothed.npy'
         mediapipe3d_reprojectionError_npy_path = data_arrays_path / 'mediaPipeSkel_reprojErr.npy'
 
-        # session data
-        self.mediapipe3d_frames_trackedPoints_xyz = np.load(str(mediapipe3d_xyz_npy_path)) / 1000  # convert to meters
-        mediapipe3d_frames_trackedPoints_reprojectionError = np.load(str(mediapipe3d_reprojectionError_npy_path))
+        # session data is memory mapped, frames get converted to meters (and mirrored, y-z swapped) on access
+        if raw:
+            self.mediapipe3d_frames_trackedPoints_xyz = SkeletonData(
+                str(mediapipe3d_xyz_npy_path), scale=(.001, .001, .001))
+        else:
+            self.mediapipe3d_frames_trackedPoints_xyz = SkeletonData(
+                str(mediapipe3d_xyz_npy_path), axis_order=(0, 2, 1), scale=(-.001, -.001, -.001))
+        if mediapipe3d_reprojectionError_npy_path.is_file():
+            self.mediapipe3d_frames_trackedPoints_reprojectionError = np.load(
+                str(mediapipe3d_reprojectionError_npy_path), mmap_mode='r')
         self.number_of_frames = self.mediapipe3d_frames_trackedPoints_xyz.shape[0]
         self.number_of_tracked_points = self.mediapipe3d_frames_trackedPoints_xyz.shape[1]
 
-        if not raw:
-            index_order = np.array([0, 2, 1])
-            mirrored_xyz = np.multiply(self.mediapipe3d_frames_trackedPoints_xyz, -1)
-            indexed_xyz = np.array([[point[index_order] for point in subarray] for subarray in mirrored_xyz])
-            self.mediapipe3d_frames_trackedPoints_xyz = indexed_xyz
-
-            # init calculator node chain
+        # init calculator node chain
         if modal_operation:
             self.node_chain = HolisticNodeChainGroup()
 
@@ -85,10 +88,10 @@ class FreemocapLoader:
             ob = cgt_bpy_utils.add_empty(0.01, f'cgt_face_vertex_{str(i - self.first_face_point)}')
             objs.append(ob)
 
-        frames = list(range(self.number_of_frames))
+        frames = np.arange(self.number_of_frames)
+        helpers = cgt_fc_actions.create_actions(objs)
         for i in range(self.mediapipe3d_frames_trackedPoints_xyz.shape[1]):
-            ob = objs[i]
-            helper = cgt_fc_actions.create_actions([ob])[0]
+            helper = helpers[i]
             obj_data = self.mediapipe3d_frames_trackedPoints_xyz[:, i]
             x, y, z = obj_data[:, 0], obj_data[:, 1], obj_data[:, 2]
             helper.foreach_set('location', frames, x, y, z)
@@ -101,101 +104,62 @@ class FreemocapLoader:
         calc_face = mp_calc_face_rot.FaceRotationCalculator()
         calc_pose = mp_calc_pose_rot.PoseRotationCalculator()
         calc_hand = mp_calc_hand_rot.HandRotationCalculator()
-
-        # prepare tracking data
-        frames = list(range(self.number_of_frames))
-        hand_data, face_data, pose_data = [], [], []
-        for frame in frames:
-            this_frame_hand_data, this_frame_face_data, this_frame_pose_data = self.get_freemocap_session_data(frame)
-            hand_data.append(this_frame_hand_data)
-            pose_data.append(this_frame_pose_data)
-            face_data.append(this_frame_face_data)
+        # the whole session is available, keep rotations continuous without frame by frame combat
+        for calculator in [calc_face, calc_pose, calc_hand]:
+            calculator.sequence_combat_mode = 'UNWRAP'
 
         # calc rotations and additional locations
         logging.info("Calculating additional rotations and locations for hands.")
-        hand_results = np.array([calc_hand.update(data, frame) for data, frame in zip(hand_data, frames)], dtype=object)
+        tracked_points = self.mediapipe3d_frames_trackedPoints_xyz
+        left_hand_locs, left_hand_rots = calc_hand.process_sequence(
+            tracked_points[:, self.first_left_hand_point:self.first_right_hand_point], "L")
+        right_hand_locs, right_hand_rots = calc_hand.process_sequence(
+            tracked_points[:, self.first_right_hand_point:self.first_face_point], "R")
         logging.info("Calculating additional rotations and locations for pose.")
-        pose_results = np.array([calc_pose.update(data, frame) for data, frame in zip(pose_data, frames)], dtype=object)
+        pose_locations, pose_rotations = calc_pose.process_sequence(
+            tracked_points[:, self.first_body_point:self.first_left_hand_point])
         logging.info("Calculating additional rotations and locations for face.")
-        face_results = np.array([calc_face.update(data, frame) for data, frame in zip(face_data, frames)], dtype=object)
-
-        def split_transform_data(transform, m_frame):
-            """ Returns locs and rots [[n (objs)], [x, y, z, idx, frame]] """
-            if not len(transform.shape) > 1:
-                return np.array([])
-            return np.array([np.array([*x, i, m_frame]) for x, i in zip(transform[:, 1], transform[:, 0])])
-
-        def flatten_generic_tracking_data(results):
-            """ Returns locs and rots [[n], [n (objs)], [x, y, z, idx, frame]] for pose or face. """
-            locations, rotations = [], []
-
-            for _tuple, m_frame in results:
-                loc, rot, _ = _tuple
-
-                if len(loc) > 0:
-                    locations.append(split_transform_data(np.array(loc, dtype=object), m_frame))
-                if len(rot) > 0:
-                    rotations.append(split_transform_data(np.array(rot, dtype=object), m_frame))
-
-            return [np.array(locations, dtype=object), np.array(rotations, dtype=object)]
-
-        def flatten_hand_tracking_data(results):
-            """ Returns locs and rots [[n], [n (objs)], [x, y, z, idx, frame]] for left and right hand. """
-            transform_arrays = [[], [], [], []]
-
-            for _tuple, m_frame in results:
-                locations, rotations, _ = _tuple
-
-                left_loc_data, right_loc_data = np.array(locations, dtype=object)
-                left_rot_data, right_rot_data = np.array(rotations, dtype=object)
+        face_locations, face_rotations = calc_face.process_sequence(
+            tracked_points[:, self.first_face_point:])
 
-                transform_data = [left_loc_data, right_loc_data, left_rot_data, right_rot_data]
-                for arr, data in zip(transform_arrays, transform_data):
-                    if not len(data) > 0:
-                        continue
-                    arr.append(split_transform_data(data, m_frame))
+        def apply_sequence_to_fcurves(data, objects: List[Any], data_path: str = 'location', indices=None):
+            """ Applies (frames, n, 3) data directly to fcurves, skips frames containing nan values.
+                indices: object index for each of the n columns, defaults to the column index. """
+            if indices is None:
+                indices = range(data.shape[1])
 
-            return [np.array(arr, dtype=object) for arr in transform_arrays]
+            for column, object_idx in enumerate(indices):
+                ob_data = data[:, column]
+                valid = np.all(np.isfinite(ob_data), axis=1)
+                x, y, z = ob_data[valid, 0], ob_data[valid, 1], ob_data[valid, 2]
 
-        # f-curves require raveled locations therefore flatten shapes or the tracking results
-        pose_locations, pose_rotations = flatten_generic_tracking_data(pose_results)
-        left_hand_locs, right_hand_locs, left_hand_rots, right_hand_rots = flatten_hand_tracking_data(hand_results)
-        face_locations, face_rotations = flatten_generic_tracking_data(face_results)
-
-        def apply_data_to_fcurves(data, objects: List[Any], data_path: str = 'location'):
-            """ Applies data directly to fcurvers to prevent recalculation of fcurves. """
-            if len(data.shape) != 3 or (data.shape[2] != 5):
-                logging.error(f"Shape of data doesn't match {data.shape} - expected (n, n, 5).")
-                return
-
-            for object_idx in range(data.shape[1]):
-                ob_data = data[:, object_idx]
-                x, y, z, idx, frames = ob_data[:, 0], ob_data[:, 1], ob_data[:, 2], ob_data[:, 3], ob_data[:, 4]
-                ob = objects[int(idx[0])]
-
-                # overwrite action by default
-                if data_path == "rotation_euler":
-                    helper = cgt_fc_actions.create_actions([ob], overwrite=False)[0]
-                else:
-                    helper = cgt_fc_actions.create_actions([ob])[0]
-
-                helper.foreach_set(data_path, frames, x, y, z)
+                helper = actions.get(objects[object_idx])
+                helper.foreach_set(data_path, np.flatnonzero(valid), x, y, z)
 
         # apply data to blender
         logging.info("Create new f-curves and apply data.")
         hand_output = mp_hand_out.CgtMPHandOutNode()
-        apply_data_to_fcurves(left_hand_locs, hand_output.left_hand, 'location')
-        apply_data_to_fcurves(right_hand_locs, hand_output.right_hand, 'location')
-        apply_data_to_fcurves(left_hand_rots, hand_output.left_hand, 'rotation_euler')
-        apply_data_to_fcurves(right_hand_rots, hand_output.right_hand, 'rotation_euler')
-
         pose_output = mp_pose_out.MPPoseOutputNode()
-        apply_data_to_fcurves(pose_locations, pose_output.pose, 'location')
-        apply_data_to_fcurves(pose_rotations, pose_output.pose, 'rotation_euler')
-
         face_output = mp_face_out.MPFaceOutputNode()
-        apply_data_to_fcurves(face_locations, face_output.face, 'location')
-        apply_data_to_fcurves(face_rotations, face_output.face, 'rotation_euler')
+
+        # actions get replaced once per object in a single pass, rotations are added to the same actions
+        actions = cgt_fc_actions.ActionRegistry(overwrite=True)
+        actions.register(hand_output.left_hand + hand_output.right_hand + pose_output.pose + face_output.face)
+
+        hand_rot_indices = [0] + [idx for mcp, tip in calc_hand.fingers for idx in range(mcp, tip - 1)]
+        apply_sequence_to_fcurves(left_hand_locs, hand_output.left_hand, 'location')
+        apply_sequence_to_fcurves(right_hand_locs, hand_output.right_hand, 'location')
+        apply_sequence_to_fcurves(
+            left_hand_rots[:, hand_rot_indices], hand_output.left_hand, 'rotation_euler', hand_rot_indices)
+        apply_sequence_to_fcurves(
+            right_hand_rots[:, hand_rot_indices], hand_output.right_hand, 'rotation_euler', hand_rot_indices)
+
+        apply_sequence_to_fcurves(pose_locations, pose_output.pose, 'location')
+        apply_sequence_to_fcurves(pose_rotations, pose_output.pose, 'rotation_euler', calc_pose.rotation_indices)
+
+        apply_sequence_to_fcurves(face_locations[:, :468], face_output.face, 'location')
+        apply_sequence_to_fcurves(
+            face_rotations, face_output.face, 'rotation_euler', [calc_face.pivot.idx, calc_face.chin_driver.idx])
 
     def get_freemocap_session_data(self, frame: int):
         """ Gets data from frame. Splits to default mediapipe formatting. """
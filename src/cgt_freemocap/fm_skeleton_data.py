@@ -0,0 +1,42 @@
+from __future__ import annotations
+from typing import Any, Sequence, Tuple
+import numpy as np
+
+
+class SkeletonData:
+    """ Memory mapped (frames, points, xyz) session array, the axis order and scale get applied on access.
+        Only the indexed frames and points get read from disk, so long sessions don't have to fit in memory. """
+    def __init__(self, path: str, axis_order: Sequence[int] = (0, 1, 2), scale: Sequence[float] = (1., 1., 1.)):
+        """ axis_order: source axis of each output axis.
+            scale: factor of each output axis, applied after reordering. """
+        self.data = np.load(path, mmap_mode='r')
+        assert self.data.ndim == 3 and self.data.shape[2] == 3, "Expected a (frames, points, xyz) array."
+        self.axis_order = tuple(axis_order)
+        self.scale = tuple(scale)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.data.shape
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        """ Indexes (frames, points, axis) like an array, frames and points get indexed on the mapped array
+            while the axis index gets applied after transforming. Ellipsis and new axes are not supported. """
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > 3:
+            raise IndexError(f"Too many indices for (frames, points, xyz) data: {len(key)}")
+        if any(k is Ellipsis or k is None for k in key):
+            raise IndexError("Ellipsis and new axes are not supported, index frames, points and axis explicitly.")
+
+        # read the slice once, then transform axis by axis
+        data = np.asarray(self.data[key[:2]])
+        result = np.empty(data.shape, dtype=np.float64)
+        for dst, (src, scale) in enumerate(zip(self.axis_order, self.scale)):
+            np.multiply(data[..., src], scale, out=result[..., dst])
+
+        if len(key) > 2:
+            return result[(Ellipsis,) + key[2:]]
+        return result
@@ -1,14 +1,68 @@
 from __future__ import annotations
 from typing import Union, Tuple
+import threading
 import time
 import cv2
 import logging
 import numpy as np
 
+from .frame_buffer import FrameRingBuffer
+
+
+class CaptureThread(threading.Thread):
+    """ Continuously reads and (optionally) flips frames from the capture into a ring buffer.
+        Doesn't reference the stream, so the stream can be deleted while capturing. """
+    def __init__(self, capture: cv2.VideoCapture, buffer: FrameRingBuffer, mirror: bool = True):
+        super().__init__(name="cgt_capture", daemon=True)
+        self.capture = capture
+        self.buffer = buffer
+        self.mirror = mirror
+        self.running = threading.Event()
+        self.running.set()
+        self.scratch = None
+
+    def run(self):
+        try:
+            while self.running.is_set():
+                updated, frame = self.capture.read(self.scratch)
+                timestamp = time.perf_counter()
+                if not updated:
+                    if self.buffer.lossless:
+                        # end of movie file
+                        break
+                    time.sleep(.005)
+                    continue
+
+                self.scratch = frame
+                self.buffer.allocate(frame.shape, frame.dtype)
+                slot = self.buffer.acquire(timeout=.5)
+                if slot is None:
+                    continue
+                if self.mirror:
+                    cv2.flip(frame, 1, self.buffer.frames[slot])
+                else:
+                    np.copyto(self.buffer.frames[slot], frame)
+                self.buffer.publish(slot, timestamp)
+        finally:
+            # pending frames remain available to the consumer
+            self.buffer.close()
+
+    def stop(self):
+        self.running.clear()
+        self.buffer.close()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=1.)
+
 
 class Stream:
     updated: bool = None
     frame: np.ndarray = None
+    # preallocated buffers reused every frame
+    capture_buffer: np.ndarray = None
+    mirror_buffer: np.ndarray = None
+    rgb_buffer: np.ndarray = None
+    preview_buffer: np.ndarray = None
+    inference_buffer: np.ndarray = None
     input_type: int = None
     color_spaces = {
         'rgb': cv2.COLOR_BGR2RGB,
@@ -17,11 +71,38 @@ class Stream:
     dim: Tuple[int, int]
     is_movie: bool = False
     frame_configured: bool = False
+    capture_thread: CaptureThread = None
+    frame_timeout: float = .1
+    headless: bool = False
+    preview_step: int = 1
+    updates: int = 0
+    mirror: bool = True
+    inference_size: int = 0
+    inference_dim: Tuple[int, int] = None
+    # capture time of the frame, earlier webcam frames get dropped
+    timestamp: float = None
+    min_timestamp: float = None
 
     def __init__(self, capture_input: Union[str, int], title: str = "Stream Detection",
-                 width: int = 640, height: int = 480, backend: int = 0):
-        """ Generates a video stream for webcam or opens a movie file using cv2 """
+                 width: int = 640, height: int = 480, backend: int = 0,
+                 threaded: bool = False, buffer_size: int = 4, headless: bool = False, preview_step: int = 1,
+                 mirror: bool = True, inference_size: int = 0):
+        """ Generates a video stream for webcam or opens a movie file using cv2.
+            threaded: read frames on a background thread into a ring buffer of buffer_size frames,
+            the newest frame gets used for webcams while movie frames are processed in order.
+            headless: doesn't open a window, drawing and key polling get skipped.
+            preview_step: only every nth frame gets drawn.
+            mirror: flips frames horizontally.
+            inference_size: longest side of the frame passed to detection, 0 uses the capture resolution.
+            Landmarks are normalized, only the detection copy gets downscaled.
+            Webcam frames captured before min_timestamp are stale and get skipped. """
         self.set_capture(capture_input, backend)
+        self.mirror = mirror
+        self.inference_size = inference_size
+        self.inference_dim = None
+        self.headless = headless
+        self.preview_step = max(1, preview_step)
+        self.updates = 0
 
         self.dim = (width, height)
         self.frame_configured = False
@@ -39,38 +120,103 @@ class Stream:
                 raise IOError("Cannot open webcam")
         self.title = title
 
+        if threaded:
+            self.capture_thread = CaptureThread(
+                self.capture, FrameRingBuffer(buffer_size, lossless=self.is_movie), self.mirror)
+            self.capture_thread.start()
+
+    @property
+    def preview(self) -> bool:
+        """ Whether the current frame should be drawn. """
+        return not self.headless and self.updates % self.preview_step == 0
+
     def update(self):
-        self.updated, frame = self.capture.read()
-        self.frame = cv2.flip(frame, 1)
+        self.updates += 1
+        if self.capture_thread is not None:
+            return self.update_from_buffer()
+
+        self.updated, frame = self.capture.read(self.capture_buffer)
+        self.timestamp = time.perf_counter()
+        if not self.is_movie and self.min_timestamp is not None:
+            # reading blocks until the camera delivers the next frame
+            deadline = self.timestamp + self.frame_timeout
+            while self.updated and self.timestamp < self.min_timestamp and self.timestamp < deadline:
+                self.updated, frame = self.capture.read(frame)
+                self.timestamp = time.perf_counter()
+        if not self.updated:
+            self.frame = None
+            return
+
+        self.capture_buffer = frame
+        if self.mirror:
+            self.mirror_buffer = cv2.flip(frame, 1, self.mirror_buffer)
+            frame = self.mirror_buffer
+        self.frame = frame
+
+    def update_from_buffer(self):
+        """ Pulls the next frame from the capture thread. Movie frames are awaited,
+            webcam frames only for the frame_timeout, as the newest frame may not be available yet. """
+        if self.is_movie:
+            frame = self.capture_thread.buffer.consume(None)
+        else:
+            frame = self.capture_thread.buffer.consume(self.frame_timeout, self.min_timestamp)
+        self.updated = frame is not None
+        self.timestamp = self.capture_thread.buffer.timestamp
+        self.frame = frame
 
     def set_color_space(self, space):
         self.frame = cv2.cvtColor(self.frame, self.color_spaces[space])
 
+    def rgb_frame(self) -> np.ndarray:
+        """ Converts the bgr frame to rgb in a reused buffer, the frame itself remains bgr for drawing.
+            The frame gets downscaled to the inference size before the conversion. """
+        frame = self.frame
+        if self.inference_size > 0:
+            if self.inference_dim is None:
+                self.inference_dim = self.fit_dimensions(frame.shape, (self.inference_size, self.inference_size))
+            if self.inference_dim[0] < frame.shape[1]:
+                self.inference_buffer = cv2.resize(
+                    frame, self.inference_dim, self.inference_buffer, interpolation=cv2.INTER_AREA)
+                frame = self.inference_buffer
+
+        if self.rgb_buffer is not None:
+            self.rgb_buffer.flags.writeable = True
+        self.rgb_buffer = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, self.rgb_buffer)
+        return self.rgb_buffer
+
+    @staticmethod
+    def fit_dimensions(shape: Tuple[int, ...], target: Tuple[int, int]) -> Tuple[int, int]:
+        """ Fits the frame shape (h, w) in the target (w, h) keeping the aspect ratio. """
+        (h, w) = shape[:2]
+        (tar_w, tar_h) = target
+
+        if h < w:   # landscape
+            aspect = tar_w / float(w)
+            return tar_w, int(h*aspect)
+        elif h > w:     # portrait
+            aspect = tar_h / float(h)
+            return int(w*aspect), tar_h
+        return tar_w, tar_w
+
     def resize_movie_frame(self):
         if not self.frame_configured:
-            (h, w) = self.frame.shape[:2]
-            (tar_w, tar_h) = self.dim
-
-            if h < w:   # landscape
-                aspect = tar_w / float(w)
-                self.dim = (tar_w, int(h*aspect))
-            elif h > w:     # portrait
-                aspect = tar_h / float(h)
-                self.dim = (int(w*aspect), tar_h)
-            else:
-                self.dim = (tar_w, tar_w)
-
+            self.dim = self.fit_dimensions(self.frame.shape, self.dim)
             self.frame_configured = True
 
-        return cv2.resize(self.frame, self.dim, interpolation=cv2.INTER_AREA)
+        self.preview_buffer = cv2.resize(self.frame, self.dim, self.preview_buffer, interpolation=cv2.INTER_AREA)
+        return self.preview_buffer
 
     def draw(self):
+        if self.headless:
+            return
         f = self.frame
         if self.is_movie:
             f = self.resize_movie_frame()
         cv2.imshow(self.title, f)
 
     def exit_stream(self):
+        if self.headless:
+            return False
         if cv2.waitKey(1) & 0xFF == ord('q'):
             logging.debug("ATTEMPT TO EXIT STEAM")
             return True
@@ -98,6 +244,8 @@ class Stream:
 
     def __del__(self):
         logging.debug("DEL STREAM")
+        if self.capture_thread is not None:
+            self.capture_thread.stop()
         self.capture.release()
         cv2.destroyAllWindows()
 
@@ -0,0 +1,110 @@
+from __future__ import annotations
+from collections import deque
+from typing import Optional, Tuple
+import threading
+import time
+import numpy as np
+
+
+class FrameRingBuffer:
+    """ Fixed size ring of preallocated frames shared by a capture thread (producer) and the detector (consumer).
+        lossless=False: latest frame wins, older unread frames get overwritten (webcam).
+        lossless=True: frames are queued, the producer waits while the buffer is full (movie files).
+        Every slot keeps the capture timestamp of its frame. """
+    frames: np.ndarray = None
+    timestamps: np.ndarray = None
+    size: int
+    lossless: bool
+    closed: bool = False
+
+    def __init__(self, size: int = 4, lossless: bool = False):
+        assert size >= 3, "Ring buffer requires at least a read, write and pending slot."
+        self.size = size
+        self.lossless = lossless
+        self.closed = False
+        self.frames = None
+        self.timestamps = np.zeros(size)
+        self.timestamp = None
+
+        self.condition = threading.Condition()
+        self.free = deque(range(size))
+        self.pending = deque()
+        self.reading = None
+
+    def allocate(self, shape: Tuple[int, ...], dtype=np.uint8):
+        """ Allocates the frame slots, shape of a single frame. """
+        with self.condition:
+            if self.frames is not None and self.frames.shape[1:] == tuple(shape) and self.frames.dtype == dtype:
+                return
+            self.frames = np.empty((self.size, *shape), dtype=dtype)
+
+    def acquire(self, timeout: float = None) -> Optional[int]:
+        """ Returns the index of a slot the producer may write to.
+            Returns None if the buffer got closed or no slot got free in time. """
+        with self.condition:
+            if not self.lossless and not self.free and self.pending:
+                # overwrite the oldest unread frame
+                self.free.append(self.pending.popleft())
+
+            if not self.condition.wait_for(lambda: self.free or self.closed, timeout):
+                return None
+            if self.closed:
+                return None
+            return self.free.popleft()
+
+    def publish(self, slot: int, timestamp: float = None):
+        """ Marks a written slot as readable, the timestamp defaults to the current time. """
+        with self.condition:
+            self.timestamps[slot] = time.perf_counter() if timestamp is None else timestamp
+            self.pending.append(slot)
+            if not self.lossless:
+                # only the newest frame is of interest
+                while len(self.pending) > 1:
+                    self.free.append(self.pending.popleft())
+            self.condition.notify_all()
+
+    def discard(self, slot: int):
+        """ Returns an acquired slot without publishing it. """
+        with self.condition:
+            self.free.append(slot)
+            self.condition.notify_all()
+
+    def consume(self, timeout: float = None, min_timestamp: float = None) -> Optional[np.ndarray]:
+        """ Returns the next frame (lossless) or the newest frame, the previously consumed slot gets released.
+            Pending frames captured before min_timestamp are stale, they get dropped while waiting for a newer one.
+            The frame stays valid until the next call, its capture time is stored in timestamp.
+            Returns None on timeout or if closed and empty. """
+        with self.condition:
+            self.release()
+            if not self.condition.wait_for(lambda: self.drop_stale(min_timestamp) or self.closed, timeout):
+                return None
+            if not self.pending:
+                return None
+            self.reading = self.pending.popleft()
+            self.timestamp = float(self.timestamps[self.reading])
+            return self.frames[self.reading]
+
+    def drop_stale(self, min_timestamp: float = None) -> bool:
+        """ Frees pending frames captured before min_timestamp, returns whether frames remain pending. """
+        if min_timestamp is not None:
+            while self.pending and self.timestamps[self.pending[0]] < min_timestamp:
+                self.free.append(self.pending.popleft())
+                self.condition.notify_all()
+        return len(self.pending) > 0
+
+    def release(self):
+        """ Releases the slot of the last consumed frame. """
+        with self.condition:
+            if self.reading is not None:
+                self.free.append(self.reading)
+                self.reading = None
+                self.condition.notify_all()
+
+    def close(self):
+        """ Wakes up producer and consumer, pending frames may still be consumed. """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def __len__(self):
+        return len(self.pending)
@@ -0,0 +1,156 @@
+""" Detects movie files in a pool of headless worker processes.
+    The movie gets split into frame ranges, every worker opens its own capture and detector.
+    Results are returned in frame order and match the detectors update output. """
+from __future__ import annotations
+from collections import deque
+from typing import List, Tuple, Optional, Any, Type
+import copy
+import multiprocessing
+import logging
+import os
+
+import cv2
+
+from . import cv_stream, mp_detector_node
+
+
+def detector_class(detector_type: str) -> Type[mp_detector_node.DetectorNode]:
+    from . import mp_hand_detector, mp_face_detector, mp_pose_detector, mp_holistic_detector
+    detectors = {
+        'HAND':     mp_hand_detector.HandDetector,
+        'FACE':     mp_face_detector.FaceDetector,
+        'POSE':     mp_pose_detector.PoseDetector,
+        'HOLISTIC': mp_holistic_detector.HolisticDetector,
+    }
+    return detectors[detector_type]
+
+
+def create_detector(detector_type: str, stream: Optional[cv_stream.Stream], *args) -> mp_detector_node.DetectorNode:
+    """ Creates a detector by type, args are passed to the detectors init. """
+    return detector_class(detector_type)(stream, *args)
+
+
+def frame_ranges(frame_count: int, chunks: int, min_chunk_size: int = 60) -> List[Tuple[int, int]]:
+    """ Splits frames in continuous (start, end) ranges. """
+    chunk_size = max(min_chunk_size, -(-frame_count // max(chunks, 1)))
+    return [(start, min(start + chunk_size, frame_count)) for start in range(0, frame_count, chunk_size)]
+
+
+# region worker
+_detector: mp_detector_node.DetectorNode = None
+
+
+def init_worker(detector_type: str, movie_path: str, detector_args: tuple, stream_kwargs: dict):
+    """ Creates the headless stream and detector once per worker process. """
+    global _detector
+    stream = cv_stream.Stream(movie_path, "Movie Detection", headless=True, **stream_kwargs)
+    _detector = create_detector(detector_type, stream, *detector_args)
+
+
+def seek(capture: cv2.VideoCapture, frame: int) -> bool:
+    """ Moves the capture to the frame. Seeking is only accurate to the nearest keyframe for many codecs,
+        if the capture doesn't land on the frame it gets read forward from the start of the movie. """
+    if int(capture.get(cv2.CAP_PROP_POS_FRAMES)) == frame:
+        return True
+
+    capture.set(cv2.CAP_PROP_POS_FRAMES, frame)
+    if int(capture.get(cv2.CAP_PROP_POS_FRAMES)) == frame:
+        return True
+
+    logging.warning(f"Seeking to frame {frame} isn't frame accurate, reading forward instead.")
+    capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    for _ in range(frame):
+        if not capture.grab():
+            return False
+    return True
+
+
+def detect_frame_range(frame_range: Tuple[int, int]) -> List[Tuple[int, Any]]:
+    """ Detects the frames of a range, returns (frame, detection results) pairs.
+        The results may end early if frames cannot be read. """
+    start, end = frame_range
+    if not seek(_detector.stream.capture, start):
+        return []
+    # tracking results of a previous range don't apply
+    _detector.close()
+
+    results = []
+    for frame in range(start, end):
+        data, _ = _detector.update([], frame)
+        if data is None:
+            break
+        results.append((frame, data))
+    return results
+# endregion
+
+
+class MovieDetectionPool:
+    """ Runs movie detection in worker processes, detection results may be pulled in frame order.
+        Frames missing in the results of a range get replaced by empty results, so results stay in frame order. """
+    pool = None
+    # next frame to be returned
+    frame: int = 0
+    missing_frames: int = 0
+
+    def __init__(self, detector_type: str, movie_path: str, detector_args: tuple = (),
+                 processes: int = None, executable: str = None, stream_kwargs: dict = None):
+        capture = cv2.VideoCapture(movie_path)
+        self.frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        capture.release()
+
+        if processes is None or processes < 1:
+            processes = max(1, (os.cpu_count() or 2) - 1)
+
+        # spawn processes as forking the host application isn't safe
+        context = multiprocessing.get_context('spawn')
+        if executable is not None:
+            context.set_executable(executable)
+
+        ranges = frame_ranges(self.frame_count, processes * 4)
+        logging.info(f"Detecting {self.frame_count} frames in {len(ranges)} ranges using {processes} processes.")
+        self.pool = context.Pool(
+            min(processes, max(len(ranges), 1)), initializer=init_worker,
+            initargs=(detector_type, movie_path, detector_args, stream_kwargs or {})
+        )
+        self.results = self.pool.imap(detect_frame_range, ranges)
+        self.pending = deque()
+        self.empty_data = detector_class(detector_type).empty_data(None)
+        self.frame = 0
+        self.missing_frames = 0
+
+    def next(self, timeout: float = None) -> Optional[Any]:
+        """ Returns the detection results of the next frame or None if not available in time.
+            Raises StopIteration when all frames have been returned. """
+        while self.pending and self.pending[0][0] < self.frame:
+            self.pending.popleft()
+
+        if not self.pending:
+            try:
+                results = self.results.next(timeout)
+            except StopIteration:
+                if self.missing_frames > 0:
+                    logging.warning(f"Replaced {self.missing_frames} undetected frames by empty results.")
+                raise
+            except multiprocessing.TimeoutError:
+                return None
+            self.pending.extend(results)
+            if not self.pending:
+                # empty range, the following range fills the gap
+                return None
+
+        frame, data = self.pending[0]
+        self.frame += 1
+        if frame > self.frame - 1:
+            self.missing_frames += 1
+            return copy.deepcopy(self.empty_data)
+        self.pending.popleft()
+        return data
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def __del__(self):
+        self.close()
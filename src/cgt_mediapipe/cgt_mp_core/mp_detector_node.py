@@ -5,21 +5,53 @@ from abc import abstractmethod
 
 from . import cv_stream
 from ...cgt_core.cgt_patterns import cgt_nodes
+from ...cgt_core.cgt_utils.cgt_timers import FrameClock
 
 
 class DetectorNode(cgt_nodes.InputNode):
     stream: cv_stream.Stream = None
     solution = None
+    mp_lib = None
+    # tracking uses previous results as input for the next frame
+    static_image_mode: bool = False
+    # maps capture timestamps to frames, replaces the frame passed on update
+    frame_clock: FrameClock = None
 
     def __init__(self, stream: cv_stream.Stream = None):
         self.stream = stream
+        self.mp_lib = None
         self.drawing_utils = solutions.drawing_utils
         self.drawing_style = solutions.drawing_styles
 
+    def update(self, data, frame):
+        if self.frame_clock is None:
+            return self.exec_detection(self.get_solution()), frame
+
+        # skip frames captured before the next key frame
+        self.stream.min_timestamp = self.frame_clock.next_timestamp()
+        data = self.exec_detection(self.get_solution())
+        if data is not None and self.stream.updated:
+            frame = self.frame_clock.frame(self.stream.timestamp)
+        return data, frame
+
     @abstractmethod
-    def update(self, *args):
+    def create_solution(self):
+        """ Returns a new mediapipe solution instance. """
         pass
 
+    def get_solution(self):
+        """ The solution gets created once and kept for the lifetime of the detector,
+            loading the model graph is expensive and tracking requires a persistent instance. """
+        if self.mp_lib is None:
+            self.mp_lib = self.create_solution()
+        return self.mp_lib
+
+    def close(self):
+        """ Closes the solution and releases its resources. """
+        if self.mp_lib is not None:
+            self.mp_lib.close()
+            self.mp_lib = None
+
     @abstractmethod
     def contains_features(self, mp_res):
         pass
@@ -56,26 +88,30 @@ class DetectorNode(cgt_nodes.InputNode):
             # ignore frame if not available
             return self.empty_data()
 
-        # detect features in frame
-        self.stream.frame.flags.writeable = False
-        self.stream.set_color_space('rgb')
-        mp_res = mp_lib.process(self.stream.frame)
-        self.stream.set_color_space('bgr')
+        # detect features in frame, pass the rgb copy by reference
+        rgb_frame = self.stream.rgb_frame()
+        rgb_frame.flags.writeable = False
+        mp_res = mp_lib.process(rgb_frame)
+
+        # drawing, showing and key polling only on preview frames
+        preview = self.stream.preview
 
         # proceed if contains features
         if not self.contains_features(mp_res):
-            self.stream.draw()
-            if self.stream.exit_stream():
-                return None
+            if preview:
+                self.stream.draw()
+                if self.stream.exit_stream():
+                    return None
             return self.empty_data()
 
-        # draw results
-        self.draw_result(self.stream, mp_res, self.drawing_utils)
-        self.stream.draw()
+        if preview:
+            # draw results
+            self.draw_result(self.stream, mp_res, self.drawing_utils)
+            self.stream.draw()
 
-        # exit stream
-        if self.stream.exit_stream():
-            return None
+            # exit stream
+            if self.stream.exit_stream():
+                return None
 
         return self.detected_data(mp_res)
 
@@ -84,5 +120,6 @@ class DetectorNode(cgt_nodes.InputNode):
         return [[idx, [landmark.x, landmark.y, landmark.z]] for idx, landmark in enumerate(landmark_list.landmark)]
 
     def __del__(self):
+        self.close()
         if self.stream is not None:
             del self.stream
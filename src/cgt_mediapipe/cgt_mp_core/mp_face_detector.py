@@ -12,13 +12,12 @@ class FaceDetector(DetectorNode):
         self.refine_face_landmarks = refine_face_landmarks
         self.min_detection_confidence = min_detection_confidence
 
-    def update(self, data, frame):
-        with self.solution.FaceMesh(
-                max_num_faces=1,
-                static_image_mode=False,
-                refine_landmarks=self.refine_face_landmarks,
-                min_detection_confidence=self.min_detection_confidence) as mp_lib:
-            return self.exec_detection(mp_lib), frame
+    def create_solution(self):
+        return self.solution.FaceMesh(
+            max_num_faces=1,
+            static_image_mode=self.static_image_mode,
+            refine_landmarks=self.refine_face_landmarks,
+            min_detection_confidence=self.min_detection_confidence)
 
     def empty_data(self):
         return [[[]]]
@@ -14,13 +14,12 @@ class HandDetector(DetectorNode):
         self.min_detection_confidence = min_detection_confidence
 
     # https://google.github.io/mediapipe/solutions/hands#python-solution-api
-    def update(self, data, frame):
-        with self.solution.Hands(
-                static_image_mode=True,
-                max_num_hands=2,
-                model_complexity=self.hand_model_complexity,
-                min_detection_confidence=self.min_detection_confidence) as mp_lib:
-            return self.exec_detection(mp_lib), frame
+    def create_solution(self):
+        return self.solution.Hands(
+            static_image_mode=self.static_image_mode,
+            max_num_hands=2,
+            model_complexity=self.hand_model_complexity,
+            min_detection_confidence=self.min_detection_confidence)
 
     @staticmethod
     def separate_hands(hand_data):
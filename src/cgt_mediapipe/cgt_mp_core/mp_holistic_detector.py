@@ -16,14 +16,13 @@ class HolisticDetector(mp_detector_node.DetectorNode):
         self.refine_face_landmarks = refine_face_landmarks
 
     # https://google.github.io/mediapipe/solutions/holistic#python-solution-api
-    def update(self, data, frame):
-        with self.solution.Holistic(
-                refine_face_landmarks=self.refine_face_landmarks,
-                model_complexity=self.model_complexity,
-                min_detection_confidence=self.min_detection_confidence,
-                static_image_mode=True,
-        ) as mp_lib:
-            return self.exec_detection(mp_lib), frame
+    def create_solution(self):
+        return self.solution.Holistic(
+            refine_face_landmarks=self.refine_face_landmarks,
+            model_complexity=self.model_complexity,
+            min_detection_confidence=self.min_detection_confidence,
+            static_image_mode=self.static_image_mode,
+        )
 
     def empty_data(self):
         return [[[], []], [[[]]], []]
@@ -0,0 +1,120 @@
+""" On disk cache of movie detection results.
+    Detection results are nested lists containing landmark lists `[[idx, [x, y, z]], ...]`.
+    Landmarks of all frames get stored in a single float32 array, the nesting of a frame gets stored
+    as json where landmark lists are replaced by their block index - frames usually share the same nesting. """
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, List, Optional
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """ Hashes the content of a file. """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(cache_dir: str, content_hash: str, detection_type: str, settings: tuple) -> Path:
+    """ Cache file path for the content hash, detection type and detection settings. """
+    key = hashlib.blake2b(repr((detection_type, settings)).encode('utf-8'), digest_size=8).hexdigest()
+    return Path(cache_dir) / f"{content_hash}_{detection_type.lower()}_{key}.npz"
+
+
+def is_landmark_list(data: Any) -> bool:
+    """ Checks for a non-empty `[[0, [x, y, z]], [1, [x, y, z]], ...]` list. """
+    if not isinstance(data, list) or len(data) == 0:
+        return False
+    for i, landmark in enumerate(data):
+        if not (isinstance(landmark, list) and len(landmark) == 2 and landmark[0] == i and len(landmark[1]) == 3):
+            return False
+    return True
+
+
+class LandmarkCacheWriter:
+    """ Encodes detection results frame by frame, the data may be modified after appending. """
+    def __init__(self):
+        self.landmarks = []
+        self.block_sizes = []
+        self.frame_blocks = [0]
+        self.structures = {}
+        self.frame_structures = []
+
+    def encode(self, data: Any, blocks: List[List[float]]) -> Any:
+        if is_landmark_list(data):
+            blocks.append([landmark[1] for landmark in data])
+            return len(blocks) - 1
+        if isinstance(data, list):
+            return [self.encode(d, blocks) for d in data]
+        raise TypeError(f"Cannot cache detection results containing {type(data)}")
+
+    def append(self, data: Any):
+        blocks = []
+        structure = json.dumps(self.encode(data, blocks), separators=(',', ':'))
+        for block in blocks:
+            self.landmarks.extend(block)
+            self.block_sizes.append(len(block))
+        self.frame_blocks.append(len(self.block_sizes))
+        self.frame_structures.append(self.structures.setdefault(structure, len(self.structures)))
+
+    def __len__(self):
+        return len(self.frame_structures)
+
+    def save(self, path: Path):
+        """ Writes the cache file, a partially written file never replaces the target. """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.stem + '.tmp.npz')
+        np.savez(
+            tmp_path,
+            landmarks=np.array(self.landmarks, dtype=np.float32).reshape(-1, 3),
+            block_sizes=np.array(self.block_sizes, dtype=np.int32),
+            frame_blocks=np.array(self.frame_blocks, dtype=np.int64),
+            frame_structures=np.array(self.frame_structures, dtype=np.int32),
+            structures=np.array(list(self.structures.keys()), dtype=np.str_),
+        )
+        os.replace(tmp_path, path)
+
+
+class LandmarkCacheReader:
+    """ Returns cached detection results in frame order, matches the detectors update output. """
+    def __init__(self, path: Path):
+        with np.load(path, allow_pickle=False) as cache:
+            self.landmarks = cache['landmarks']
+            self.block_sizes = cache['block_sizes']
+            self.frame_blocks = cache['frame_blocks']
+            self.frame_structures = cache['frame_structures']
+            self.structures = [json.loads(str(s)) for s in cache['structures']]
+        self.block_offsets = np.concatenate([[0], np.cumsum(self.block_sizes)])
+        self.frame = 0
+
+    def decode(self, structure: Any, first_block: int) -> Any:
+        if isinstance(structure, list):
+            return [self.decode(s, first_block) for s in structure]
+        block = first_block + structure
+        landmarks = self.landmarks[self.block_offsets[block]:self.block_offsets[block + 1]].tolist()
+        return [[idx, landmark] for idx, landmark in enumerate(landmarks)]
+
+    def get(self, frame: int) -> Any:
+        structure = self.structures[self.frame_structures[frame]]
+        return self.decode(structure, int(self.frame_blocks[frame]))
+
+    def next(self, timeout: float = None) -> Optional[Any]:
+        """ Returns the results of the next frame, raises StopIteration when all frames have been returned. """
+        if self.frame >= len(self):
+            raise StopIteration
+        data = self.get(self.frame)
+        self.frame += 1
+        return data
+
+    def close(self):
+        pass
+
+    def __len__(self):
+        return len(self.frame_structures)
@@ -11,13 +11,12 @@ class PoseDetector(mp_detector_node.DetectorNode):
         self.solution = mp.solutions.pose
 
     # https://google.github.io/mediapipe/solutions/pose#python-solution-api
-    def update(self, data, frame):
+    def create_solution(self):
         # BlazePose GHUM 3D
-        with self.solution.Pose(
-                static_image_mode=True,
-                model_complexity=self.pose_model_complexity,
-                min_detection_confidence=self.min_detection_confidence) as mp_lib:
-            return self.exec_detection(mp_lib), frame
+        return self.solution.Pose(
+            static_image_mode=self.static_image_mode,
+            model_complexity=self.pose_model_complexity,
+            min_detection_confidence=self.min_detection_confidence)
 
     def detected_data(self, mp_res):
         return self.cvt2landmark_array(mp_res.pose_world_landmarks)
@@ -1,8 +1,11 @@
 import bpy
+import time
 import logging
 
 from pathlib import Path
-from ..cgt_core.cgt_patterns import cgt_nodes
+from ..cgt_core.cgt_patterns import cgt_nodes, cgt_node_worker
+from ..cgt_core.cgt_calculators_nodes.calc_utils import ProcessorUtils
+from ..cgt_core.cgt_utils.cgt_timers import FrameClock
 
 
 class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
@@ -12,51 +15,67 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
 
     _timer: bpy.types.Timer = None
     node_chain: cgt_nodes.NodeChain = None
+    # detection pool or cached detection results of a movie
+    movie_results = None
+    cache_writer = None
+    cache_path: Path = None
+    node_worker: cgt_node_worker.NodeWorker = None
+    output_chain: cgt_nodes.Node = None
     frame = key_step = 1
-    memo = None
+    landmark_filter: cgt_nodes.CalculatorNode = None
+    # sets webcam frames from capture timestamps
+    frame_clock: FrameClock = None
     user = None
+    # max time spent per timer event applying results of the detection pool
+    pool_update_budget: float = .05
+    # timer interval range while applying results of the background detection
+    timer_interval: float = .1
+    min_timer_interval: float = .005
+    max_timer_interval: float = .1
+
+    def get_detector_args(self) -> tuple:
+        """ Arguments passed to the detector of the selected detection type (besides the stream). """
+        detector_args = {
+            'HAND':     (self.user.hand_model_complexity, self.user.min_detection_confidence),
+            'POSE':     (self.user.pose_model_complexity, self.user.min_detection_confidence),
+            'FACE':     (self.user.refine_face_landmarks, self.user.min_detection_confidence),
+            'HOLISTIC': (self.user.holistic_model_complexity, self.user.min_detection_confidence,
+                         self.user.refine_face_landmarks),
+        }
+        return detector_args[self.user.enum_detection_type]
 
     def get_chain(self, stream) -> cgt_nodes.NodeChain:
         from ..cgt_core import cgt_core_chains
-        from .cgt_mp_core import mp_hand_detector, mp_face_detector, mp_pose_detector, mp_holistic_detector
+        from ..cgt_core.cgt_calculators_nodes import calc_landmark_filter
+        from .cgt_mp_core import mp_detection_pool
 
         # create new node chain
         node_chain = cgt_nodes.NodeChain()
 
-        input_node = None
-        chain_template = None
-
         logging.debug(f"{self.user.enum_detection_type}")
-        if self.user.enum_detection_type == 'HAND':
-            input_node = mp_hand_detector.HandDetector(
-                stream, self.user.hand_model_complexity, self.user.min_detection_confidence
-            )
-            chain_template = cgt_core_chains.HandNodeChain()
-
-        elif self.user.enum_detection_type == 'POSE':
-            input_node = mp_pose_detector.PoseDetector(
-                stream, self.user.pose_model_complexity, self.user.min_detection_confidence
-            )
-            chain_template = cgt_core_chains.PoseNodeChain()
-
-        elif self.user.enum_detection_type == 'FACE':
-            input_node = mp_face_detector.FaceDetector(
-                stream, self.user.refine_face_landmarks, self.user.min_detection_confidence
-            )
-            chain_template = cgt_core_chains.FaceNodeChain()
-
-        elif self.user.enum_detection_type == 'HOLISTIC':
-            input_node = mp_holistic_detector.HolisticDetector(
-                stream, self.user.holistic_model_complexity,
-                self.user.min_detection_confidence, self.user.refine_face_landmarks
-            )
-            chain_template = cgt_core_chains.HolisticNodeChainGroup()
+        input_node = mp_detection_pool.create_detector(
+            self.user.enum_detection_type, stream, *self.get_detector_args())
+        chain_templates = {
+            'HAND':     cgt_core_chains.HandNodeChain,
+            'POSE':     cgt_core_chains.PoseNodeChain,
+            'FACE':     cgt_core_chains.FaceNodeChain,
+            'HOLISTIC': cgt_core_chains.HolisticNodeChainGroup,
+        }
+        chain_template = chain_templates[self.user.enum_detection_type]()
 
         if input_node is None or chain_template is None:
             self.report({'ERROR'}, f"Setting up nodes failed: Input: {input_node}, Chain: {chain_template}")
             return None
 
+        # filters landmarks between detection and calculation
+        self.landmark_filter = None
+        if self.user.enum_landmark_filter != 'NONE':
+            self.landmark_filter = calc_landmark_filter.LandmarkFilterNode(
+                self.user.enum_landmark_filter, frequency=bpy.context.scene.render.fps)
+
         node_chain.append(input_node)
+        if self.landmark_filter is not None:
+            node_chain.append(self.landmark_filter)
         node_chain.append(chain_template)
 
         logging.info(f"{node_chain}")
@@ -75,7 +94,11 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
                 logging.error(f"GIVEN PATH IS NOT VALID {mov_path}")
                 return {'FINISHED'}
 
-            stream = cv_stream.Stream(str(mov_path), "Movie Detection")
+            stream = cv_stream.Stream(
+                str(mov_path), "Movie Detection", threaded=self.user.threaded_capture,
+                headless=not self.user.show_preview, preview_step=self.user.preview_step,
+                mirror=self.user.mirror_stream, inference_size=int(self.user.enum_inference_dim)
+            )
 
         else:
             camera_index = self.user.webcam_input_device
@@ -86,13 +109,47 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
                 'fhd': (1920, 1080)
             }
             backend = int(self.user.enum_stream_type)
+            # opencv windows have to be drawn and polled on the main thread (macOS)
+            headless = not self.user.show_preview or self.user.use_background_detection
 
             stream = cv_stream.Stream(
                 capture_input=camera_index, backend=backend,
                 width=dimensions[dim][0], height=dimensions[dim][1],
+                threaded=self.user.threaded_capture,
+                headless=headless, preview_step=self.user.preview_step,
+                mirror=self.user.mirror_stream, inference_size=int(self.user.enum_inference_dim)
             )
         return stream
 
+    def get_stream_kwargs(self) -> dict:
+        """ Stream settings which affect the detection results. """
+        return {'mirror': self.user.mirror_stream, 'inference_size': int(self.user.enum_inference_dim)}
+
+    def get_cache_path(self, mov_path: str) -> Path:
+        """ Cache file of the movie for the current detection settings. """
+        from .cgt_mp_core import mp_landmark_cache
+        cache_dir = bpy.utils.user_resource('DATAFILES', path="BlendArMocap/landmark_cache", create=True)
+        settings = (self.get_detector_args(), tuple(sorted(self.get_stream_kwargs().items())))
+        return mp_landmark_cache.cache_path(
+            cache_dir, mp_landmark_cache.file_hash(mov_path), self.user.enum_detection_type, settings)
+
+    def get_detection_pool(self):
+        """ Detects the movie in worker processes, results get applied while processing. """
+        from . import cgt_dependencies
+        from .cgt_mp_core import mp_detection_pool
+        self.key_step = self.user.key_frame_step
+        self.frame = bpy.context.scene.frame_current
+
+        mov_path = bpy.path.abspath(self.user.mov_data_path)
+        if not Path(mov_path).is_file():
+            logging.error(f"GIVEN PATH IS NOT VALID {mov_path}")
+            return None
+
+        return mp_detection_pool.MovieDetectionPool(
+            self.user.enum_detection_type, str(mov_path), self.get_detector_args(),
+            self.user.detection_processes, cgt_dependencies.get_python_exe(), self.get_stream_kwargs()
+        )
+
     def execute(self, context):
         """ Runs movie or stream detection depending on user input. """
         self.user = context.scene.cgtinker_mediapipe  # noqa
@@ -106,19 +163,64 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
             self.user.modal_active = True
 
         # init stream and chain
-        stream = self.get_stream()
+        stream = None
+        self.movie_results = None
+        self.cache_writer = None
+        self.cache_path = None
+        if self.user.detection_input_type == 'movie' and self.user.use_landmark_cache:
+            from .cgt_mp_core import mp_landmark_cache
+            mov_path = bpy.path.abspath(self.user.mov_data_path)
+            if Path(mov_path).is_file():
+                self.cache_path = self.get_cache_path(mov_path)
+                if self.cache_path.is_file():
+                    # skip detection, the detector of the chain remains unused
+                    logging.info(f"Loading cached detection results: {self.cache_path}")
+                    self.key_step = self.user.key_frame_step
+                    self.frame = context.scene.frame_current
+                    self.movie_results = mp_landmark_cache.LandmarkCacheReader(self.cache_path)
+                else:
+                    self.cache_writer = mp_landmark_cache.LandmarkCacheWriter()
+
+        if self.movie_results is not None:
+            pass
+        elif self.user.detection_input_type == 'movie' and self.user.use_detection_pool:
+            # the detector of the chain remains unused
+            self.movie_results = self.get_detection_pool()
+            if self.movie_results is None:
+                self.user.modal_active = False
+                return {'FINISHED'}
+        else:
+            stream = self.get_stream()
+
         self.node_chain = self.get_chain(stream)
         if self.node_chain is None:
             self.user.modal_active = False
             return {'FINISHED'}
 
+        # key webcam results at the frame they have been captured
+        self.frame_clock = None
+        if self.user.detection_input_type == 'stream' and self.user.use_real_time:
+            render = context.scene.render
+            self.frame_clock = FrameClock(render.fps / render.fps_base, self.frame, self.key_step)
+            self.node_chain.nodes[0].frame_clock = self.frame_clock
+
+        # detect and calculate on a background thread, output nodes run on timer events
+        self.node_worker = None
+        if self.user.detection_input_type == 'stream' and self.user.use_background_detection:
+            calculator_chain, self.output_chain = cgt_nodes.split_output_nodes(self.node_chain)
+            self.node_worker = cgt_node_worker.NodeWorker(calculator_chain, self.frame, self.key_step)
+            self.node_worker.start()
+
         # add a timer property and start running
         wm = context.window_manager
-        self._timer = wm.event_timer_add(0.1, window=context.window)
+        self.timer_interval = 0.1
+        if self.movie_results is not None:
+            self.timer_interval = 0.01
+        elif self.node_worker is not None:
+            self.timer_interval = 0.03
+        self._timer = wm.event_timer_add(self.timer_interval, window=context.window)
         context.window_manager.modal_handler_add(self)
 
-        # memo skipped frames
-        self.memo = []
         self.report({'INFO'}, f"Running {self.user.enum_detection_type} as modal.")
         return {'RUNNING_MODAL'}
 
@@ -126,68 +228,49 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
     def poll(cls, context):
         return context.mode in {'OBJECT', 'POSE'}
 
-    @staticmethod
-    def simple_smoothing(memo, cur):
-        """ Expects list with sub-lists containing [int, [float, float, float]].
-        Smooths the float part of the sub-lists. """
-        def smooth_by_add_divide(x, y):
-            for i, *_ in enumerate(zip(x, y)):
-                x[i] += y[i]
-                x[i] /= 2
-
-        def addable(x, y):
-            # check if [int, [float, float float]]
-            if not isinstance(x, list) or not isinstance(y, list):
-                print("CATCHED NOT LIST ERR")
-                return False
-
-            if not len(x) == 2 or not len(y) == 2:
-                return False
-
-            if not len(x[1]) == 3 or not len(y[1]) == 3:
-                return False
-
-            smooth_by_add_divide(x[1], y[1])
-            return True
-
-        def smooth_memo_contents(x, y):
-            # checks if addable contents, else splits into sub-arrays
-            # and retries. y may get added to x, if x is empty.
-            if not isinstance(y, list):
-                return
-            if not isinstance(x, list):
-                x = y
-            if len(x) == 0 and len(y) != 0:
-                x += y
-
-            for l1, l2 in zip(x, y):
-                if not addable(l1, l2):
-                    smooth_memo_contents(l1, l2)
-
-        smooth_memo_contents(memo, cur)
-        return memo
-
     def modal(self, context, event):
         """ Run detection as modal operation, finish with 'Q', 'ESC' or 'RIGHT MOUSE'. """
         if event.type == "TIMER" and self.user.modal_active:
-            if self.user.detection_input_type == 'movie':
+            if self.movie_results is not None:
+                # apply results of the detection pool or cache in frame order
+                deadline = time.perf_counter() + self.pool_update_budget
+                while time.perf_counter() < deadline:
+                    try:
+                        data = self.movie_results.next(timeout=0)
+                    except StopIteration:
+                        self.save_cache()
+                        return self.cancel(context)
+                    if data is None:
+                        break
+                    self.update_movie_frame(data)
+
+            elif self.node_worker is not None:
+                # apply results of the background detection
+                results, finished = self.node_worker.drain()
+                for data, frame in results:
+                    self.output_chain.update(data, frame)
+                    if self.frame_clock is not None:
+                        self.frame_clock.record(frame)
+                if finished:
+                    return self.cancel(context)
+                self.adapt_timer(context, len(results))
+
+            elif self.user.detection_input_type == 'movie':
                 # get data
                 data, _frame = self.node_chain.nodes[0].update([], self.frame)
                 if data is None:
+                    if not self.node_chain.nodes[0].stream.updated:
+                        # reached the end of the movie
+                        self.save_cache()
                     return self.cancel(context)
-
-                # smooth gathered data
-                self.simple_smoothing(self.memo, data)
-                if self.frame % self.key_step == 0:
-                    for node in self.node_chain.nodes[1:]:
-                        node.update(self.memo, self.frame)
-                    self.memo.clear()
-
-                self.frame += 1
+                self.update_movie_frame(data)
             else:
-                data, _ = self.node_chain.update([], self.frame)
+                data, frame = self.node_chain.update([], self.frame)
                 if data is None:
                     return self.cancel(context)
+                if self.frame_clock is not None:
+                    self.frame_clock.record(frame)
+                    self.frame = frame
                 self.frame += self.key_step
 
         if event.type in {'Q', 'ESC', 'RIGHT_MOUSE'} or self.user.modal_active is False:
@@ -195,10 +278,69 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
 
         return {'PASS_THROUGH'}
 
+    def adapt_timer(self, context, staged_results: int):
+        """ Shortens the timer interval while results are waiting, extends it while idle. """
+        interval = self.timer_interval
+        if staged_results > 1:
+            interval *= .5
+        elif staged_results == 0:
+            interval *= 1.5
+        interval = min(max(interval, self.min_timer_interval), self.max_timer_interval)
+
+        # timers cannot be modified, replace only on significant changes
+        if abs(interval - self.timer_interval) > self.timer_interval * .2:
+            wm = context.window_manager
+            wm.event_timer_remove(self._timer)
+            self._timer = wm.event_timer_add(interval, window=context.window)
+            self.timer_interval = interval
+
+    def update_movie_frame(self, data):
+        """ Filters the detection results of every frame and applies them every key step. """
+        if self.cache_writer is not None:
+            self.cache_writer.append(data)
+        if self.landmark_filter is not None:
+            data, _ = self.landmark_filter.update(data, self.frame)
+        if self.frame % self.key_step == 0:
+            self.node_chain.nodes[-1].update(data, self.frame)
+
+        self.frame += 1
+
+    def save_cache(self):
+        """ Stores the detection results of the whole movie. """
+        if self.cache_writer is None or len(self.cache_writer) == 0:
+            return
+        logging.info(f"Caching detection results: {self.cache_path}")
+        self.cache_writer.save(self.cache_path)
+        self.cache_writer = None
+
+    def log_duplicated_frames(self):
+        """ Reports the count of dropped duplicated frames per stream of the calculators. """
+        for calculator in cgt_nodes.calculator_nodes(self.node_chain):
+            if not isinstance(calculator, ProcessorUtils) or calculator.get_duplicated_frame_count() == 0:
+                continue
+            streams = ", ".join(f"{detector_type} {idx}: {count}"
+                                for (detector_type, idx), count in calculator.duplicated_frames.items())
+            logging.info(f"Dropped duplicated frames of {calculator} ({streams})")
+            self.report({'INFO'}, f"{calculator} dropped {calculator.get_duplicated_frame_count()} duplicated frames.")
+
     def cancel(self, context):
         """ Upon finishing detection clear the handlers. """
         self.user.modal_active = False  # noqa
+        if self.node_worker is not None:
+            self.node_worker.stop()
+            self.node_worker = None
+        if self.frame_clock is not None:
+            logging.info(f"Real time detection: {self.frame_clock}")
+            self.frame_clock = None
+        self.log_duplicated_frames()
+        # write keyframes which haven't been flushed yet
+        cgt_nodes.flush_output_nodes(self.node_chain)
+        # release the detectors solution
+        self.node_chain.nodes[0].close()
         del self.node_chain
+        if self.movie_results is not None:
+            self.movie_results.close()
+            self.movie_results = None
         wm = context.window_manager
         wm.event_timer_remove(self._timer)
         logging.debug("FINISHED DETECTION")
@@ -18,6 +18,11 @@ class CGT_PT_MP_Detection(cgt_core_panel.DefaultPanel, bpy.types.Panel):
         layout = self.layout
         layout.row().prop(user, "mov_data_path")
         layout.row().prop(user, "key_frame_step")
+        layout.row().prop(user, "use_landmark_cache")
+        row = layout.row()
+        row.prop(user, "use_detection_pool")
+        if user.use_detection_pool:
+            row.prop(user, "detection_processes")
         layout.row().prop(user, "enum_detection_type")
         if user.modal_active:
             layout.row().operator("wm.cgt_feature_detection_operator", text="Stop Detection", icon='CANCEL')
@@ -28,6 +33,8 @@ class CGT_PT_MP_Detection(cgt_core_panel.DefaultPanel, bpy.types.Panel):
         layout = self.layout
         layout.row().prop(user, "webcam_input_device")
         layout.row().prop(user, "key_frame_step")
+        layout.row().prop(user, "use_background_detection")
+        layout.row().prop(user, "use_real_time")
         layout.row().prop(user, "enum_detection_type")
         if user.modal_active:
             layout.row().operator("wm.cgt_feature_detection_operator", text="Stop Detection", icon='RADIOBUT_ON')
@@ -66,6 +73,16 @@ class CGT_PT_MP_DetectorProperties(cgt_core_panel.DefaultPanel, bpy.types.Panel)
             layout.row().prop(user, "holistic_model_complexity")
 
         layout.row().prop(user, "min_detection_confidence", slider=True)
+        layout.row().prop(user, "enum_landmark_filter")
+        layout.row().prop(user, "threaded_capture")
+        layout.row().prop(user, "mirror_stream")
+        layout.row().prop(user, "enum_inference_dim")
+        row = layout.row()
+        # background detection runs headless
+        row.enabled = not (user.detection_input_type == 'stream' and user.use_background_detection)
+        row.prop(user, "show_preview")
+        if user.show_preview:
+            row.prop(user, "preview_step")
 
 
 class CGT_PT_MP_Warning(cgt_core_panel.DefaultPanel, bpy.types.Panel):
@@ -79,6 +79,19 @@ class MP_PG_Properties(bpy.types.PropertyGroup):
         )
     )
 
+    enum_inference_dim: bpy.props.EnumProperty(
+        name="Inference Size",
+        description="Longest side of the frames passed to detection. "
+                    "Frames get downscaled for detection only, the preview keeps the capture resolution.",
+        items=(
+            ("0", "Capture Resolution", ""),
+            ("960", "960px", ""),
+            ("640", "640px", ""),
+            ("480", "480px", ""),
+            ("320", "320px", ""),
+        )
+    )
+
     detection_input_type: bpy.props.EnumProperty(
         name="Type",
         description="Select input type.",
@@ -96,6 +109,85 @@ class MP_PG_Properties(bpy.types.PropertyGroup):
         default=0
     )
 
+    use_landmark_cache: bpy.props.BoolProperty(
+        name="Cache Detection",
+        description="Store detection results of movies on disk. Detecting the same movie with the same "
+                    "detection settings again loads the results instead of running the detection.",
+        default=True
+    )
+
+    use_detection_pool: bpy.props.BoolProperty(
+        name="Parallel Detection",
+        description="Detect movie frames in background processes. "
+                    "Results get applied in frame order while detecting.",
+        default=False
+    )
+
+    detection_processes: bpy.props.IntProperty(
+        name="Processes",
+        description="Number of detection processes, 0 uses all but one cpu core.",
+        min=0,
+        max=64,
+        default=0
+    )
+
+    use_background_detection: bpy.props.BoolProperty(
+        name="Background Detection",
+        description="Detect and calculate webcam results on a background thread. "
+                    "Results get keyframed on timer events, which adapt to the detection rate. "
+                    "Runs without preview window, as the window has to be updated on the main thread.",
+        default=False
+    )
+
+    use_real_time: bpy.props.BoolProperty(
+        name="Real Time",
+        description="Key webcam results at the frame they have been captured. "
+                    "Frames get dropped when detection can't keep up, the key step is the minimum step.",
+        default=False
+    )
+
+    mirror_stream: bpy.props.BoolProperty(
+        name="Mirror",
+        description="Flip frames horizontally before detection. "
+                    "Disabling saves a frame copy, left and right sides get swapped in the results.",
+        default=True
+    )
+
+    show_preview: bpy.props.BoolProperty(
+        name="Preview",
+        description="Show the stream and detection results in a window. "
+                    "Without preview drawing, the window and key polling get skipped, "
+                    "stop the detection using the panel or 'ESC'.",
+        default=True
+    )
+
+    preview_step: bpy.props.IntProperty(
+        name="Preview Step",
+        description="Only every nth frame gets drawn in the preview.",
+        min=1,
+        max=30,
+        default=1
+    )
+
+    threaded_capture: bpy.props.BoolProperty(
+        name="Threaded Capture",
+        description="Read frames on a background thread. "
+                    "Webcam detection uses the newest frame, movie frames are processed in order.",
+        default=True
+    )
+
+    enum_landmark_filter: bpy.props.EnumProperty(
+        name="Filter",
+        description="Filters landmarks over time before calculating rotations.",
+        items=(
+            ("ONE_EURO", "One Euro", "Smooths strongly while moving slowly, reduces lag on fast motions"),
+            ("EXPONENTIAL", "Exponential", "Averages the current and previous results"),
+            ("SAVITZKY_GOLAY", "Savitzky-Golay", "Fits a polynomial to the recent results, preserves peaks"),
+            ("NONE", "None", "Use the detection results as they are"),
+        ),
+        default="NONE"
+    )
+
     key_frame_step: bpy.props.IntProperty(
         name="Key Step",
         description="Select keyframe step rate.",
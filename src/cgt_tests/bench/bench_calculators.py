@@ -0,0 +1,267 @@
+""" Benchmarks the calculator nodes using synthetic landmark data.
+    Reports throughput, latency percentiles and allocations per node, results can be stored as json
+    and compared against a previous run to track regressions between versions.
+
+    Run from the repository root:
+        python -m src.cgt_tests.bench.bench_calculators --frames 2000 --json bench.json
+        python -m src.cgt_tests.bench.bench_calculators --compare bench.json """
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Any, Dict
+
+import numpy as np
+
+from . import landmark_generators as gen
+from ...cgt_core.cgt_calculators_nodes import cgt_math
+from ...cgt_core.cgt_calculators_nodes import mp_calc_face_rot, mp_calc_pose_rot, mp_calc_hand_rot
+from ...cgt_core.cgt_calculators_nodes import calc_landmark_filter
+from ...cgt_core.cgt_patterns import cgt_nodes
+
+
+class CalculatorNodeChainGroup(cgt_nodes.NodeChainGroup):
+    """ Mirrors the HolisticNodeChainGroup without output nodes, as they require bpy. """
+    def __init__(self):
+        super().__init__()
+        for calculator in [mp_calc_hand_rot.HandRotationCalculator(), mp_calc_face_rot.FaceRotationCalculator(),
+                           mp_calc_pose_rot.PoseRotationCalculator()]:
+            chain = cgt_nodes.NodeChain()
+            chain.append(calculator)
+            self.nodes.append(chain)
+
+
+def holistic_node_chain_group(use_bpy: bool = False) -> cgt_nodes.NodeChainGroup:
+    if use_bpy:
+        from ...cgt_core.cgt_core_chains import HolisticNodeChainGroup
+        return HolisticNodeChainGroup()
+    return CalculatorNodeChainGroup()
+
+
+# region measurement
+def latency_stats(latencies_ns: np.ndarray) -> Dict[str, float]:
+    """ Latencies in milliseconds and throughput in frames per second. """
+    latencies = latencies_ns / 1e6
+    total = latencies.sum()
+    return {
+        'frames':     int(len(latencies)),
+        'total_ms':   float(total),
+        'fps':        float(len(latencies) / total * 1e3) if total > 0 else float('inf'),
+        'mean_ms':    float(latencies.mean()),
+        'p50_ms':     float(np.percentile(latencies, 50)),
+        'p90_ms':     float(np.percentile(latencies, 90)),
+        'p99_ms':     float(np.percentile(latencies, 99)),
+        'max_ms':     float(latencies.max()),
+    }
+
+
+def allocation_stats(func: Callable[[], Any]) -> Dict[str, int]:
+    """ Peak and retained allocations of a call traced by tracemalloc.
+        Runs separately from the timings, tracing slows down execution significantly. """
+    tracemalloc.start()
+    try:
+        func()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'peak_bytes': peak, 'retained_bytes': retained}
+
+
+def bench_node(node_factory: Callable[[], cgt_nodes.Node], payload_factory: Callable[[], List[Any]],
+               warmup: int = 10) -> Dict[str, Any]:
+    """ Updates a fresh node with every payload and times each update.
+        Payloads get recreated for each run as some nodes modify their input. """
+    node, payloads = node_factory(), payload_factory()
+    for frame, payload in enumerate(payloads[:warmup]):
+        node.update(payload, frame)
+
+    node, payloads = node_factory(), payload_factory()
+    latencies = np.empty(len(payloads), dtype=np.int64)
+    clock = time.perf_counter_ns
+    for frame, payload in enumerate(payloads):
+        start = clock()
+        node.update(payload, frame)
+        latencies[frame] = clock() - start
+
+    result = latency_stats(latencies)
+
+    node, payloads = node_factory(), payload_factory()
+
+    def update_all():
+        for f, p in enumerate(payloads):
+            node.update(p, f)
+
+    result.update(allocation_stats(update_all))
+    result['bytes_per_frame'] = result['peak_bytes'] / max(len(payloads), 1)
+    return result
+
+
+def bench_frames(func: Callable[[Any], Any], payloads: List[Any], warmup: int = 10) -> Dict[str, Any]:
+    """ Calls a function with every payload and times each call. """
+    for payload in payloads[:warmup]:
+        func(payload)
+
+    latencies = np.empty(len(payloads), dtype=np.int64)
+    clock = time.perf_counter_ns
+    for frame, payload in enumerate(payloads):
+        start = clock()
+        func(payload)
+        latencies[frame] = clock() - start
+
+    result = latency_stats(latencies)
+
+    def call_all():
+        for p in payloads:
+            func(p)
+
+    result.update(allocation_stats(call_all))
+    result['bytes_per_frame'] = result['peak_bytes'] / max(len(payloads), 1)
+    return result
+
+
+def bench_sequence(func: Callable[[], Any], frames: int, repeat: int = 3) -> Dict[str, Any]:
+    """ Times a call processing all frames at once, reports the fastest of repeated runs. """
+    func()  # warmup
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        func()
+        runs.append(time.perf_counter_ns() - start)
+
+    total = min(runs) / 1e6
+    result = {
+        'frames':   frames,
+        'total_ms': total,
+        'fps':      frames / total * 1e3 if total > 0 else float('inf'),
+        'mean_ms':  total / frames,
+    }
+    result.update(allocation_stats(func))
+    result['bytes_per_frame'] = result['peak_bytes'] / max(frames, 1)
+    return result
+# endregion
+
+
+def run(frames: int = 1000, seed: int = 0, repeat: int = 3, use_bpy: bool = False,
+        names: List[str] = None) -> Dict[str, Any]:
+    """ Runs the benchmarks and returns a json serializable report. """
+    left, right = gen.hand_sequence(frames, seed), gen.hand_sequence(frames, seed + 1)
+    face, pose = gen.face_sequence(frames, seed), gen.pose_sequence(frames, seed)
+
+    benchmarks = {
+        'hand.update': lambda: bench_node(
+            mp_calc_hand_rot.HandRotationCalculator, lambda: gen.hand_payloads(left, right)),
+        'face.update': lambda: bench_node(
+            mp_calc_face_rot.FaceRotationCalculator, lambda: gen.face_payloads(face)),
+        'pose.update': lambda: bench_node(
+            mp_calc_pose_rot.PoseRotationCalculator, lambda: gen.pose_payloads(pose)),
+        'holistic.update': lambda: bench_node(
+            lambda: holistic_node_chain_group(use_bpy), lambda: gen.holistic_payloads(left, right, face, pose)),
+        'filter.update': lambda: bench_node(
+            calc_landmark_filter.LandmarkFilterNode, lambda: gen.holistic_payloads(left, right, face, pose)),
+        'hand.process_sequence': lambda: bench_sequence(
+            lambda: mp_calc_hand_rot.HandRotationCalculator().process_sequence(right, "R"), frames, repeat),
+        'face.process_sequence': lambda: bench_sequence(
+            lambda: mp_calc_face_rot.FaceRotationCalculator().process_sequence(face), frames, repeat),
+        'pose.process_sequence': lambda: bench_sequence(
+            lambda: mp_calc_pose_rot.PoseRotationCalculator().process_sequence(pose), frames, repeat),
+    }
+
+    # z angle methods of the hand calculator, per frame and for the whole sequence
+    hand_landmark_lists = [gen.cvt2landmark_list(hand) for hand in right]
+    for mode in mp_calc_hand_rot.HandRotationCalculator.z_angle_modes:
+        calculator = mp_calc_hand_rot.HandRotationCalculator(mode)
+        benchmarks[f'hand.z_angles.{mode}'] = lambda c=calculator: bench_frames(c.get_z_angles, hand_landmark_lists)
+        benchmarks[f'hand.z_angles.{mode}.sequence'] = lambda c=calculator: bench_sequence(
+            lambda: c.get_sequence_z_angles(right), frames, repeat)
+
+    results = {}
+    for name, benchmark in benchmarks.items():
+        if names and not any(name.startswith(n) for n in names):
+            continue
+        results[name] = benchmark()
+
+    return {
+        'meta':    {
+            'frames':           frames,
+            'seed':             seed,
+            'rotation_backend': cgt_math.rotation_backend,
+            'holistic_outputs': use_bpy,
+            'python':           platform.python_version(),
+            'numpy':            np.__version__,
+            'platform':         platform.platform(),
+        },
+        'results': results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = .1) -> List[str]:
+    """ Returns a message for every benchmark which got slower than the baseline by more than the tolerance. """
+    regressions = []
+    for name, result in report['results'].items():
+        if name not in baseline['results']:
+            continue
+        previous = baseline['results'][name]['mean_ms']
+        ratio = result['mean_ms'] / previous if previous > 0 else 1.
+        if ratio > 1. + tolerance:
+            regressions.append(f"{name}: {previous:.4f} ms -> {result['mean_ms']:.4f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def print_report(report: Dict[str, Any], baseline: Dict[str, Any] = None):
+    meta = report['meta']
+    print(f"frames: {meta['frames']}, rotation backend: {meta['rotation_backend']}, "
+          f"python {meta['python']}, numpy {meta['numpy']}")
+    print(f"{'benchmark':<36}{'fps':>10}{'mean ms':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+          f"{'peak kb':>10}{'change':>9}")
+    for name, r in report['results'].items():
+        change = ""
+        if baseline is not None and name in baseline['results']:
+            change = f"{r['mean_ms'] / baseline['results'][name]['mean_ms']:.2f}x"
+        percentiles = "".join(f"{r[p]:>10.4f}" if p in r else f"{'-':>10}" for p in ['p50_ms', 'p90_ms', 'p99_ms'])
+        print(f"{name:<36}{r['fps']:>10.1f}{r['mean_ms']:>10.4f}{percentiles}"
+              f"{r['peak_bytes'] / 1024:>10.1f}{change:>9}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the BlendArMocap calculator nodes.")
+    parser.add_argument('--frames', type=int, default=1000, help="synthetic frames per benchmark")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="repetitions of sequence benchmarks")
+    parser.add_argument('--backend', choices=cgt_math.ROTATION_BACKENDS, default=None,
+                        help="rotation backend, defaults to mathutils if available")
+    parser.add_argument('--bpy', action='store_true', help="include the output nodes (requires blender)")
+    parser.add_argument('--only', nargs='*', default=None, help="benchmark name prefixes to run")
+    parser.add_argument('--json', default=None, help="write the report to a json file")
+    parser.add_argument('--compare', default=None, help="compare against a previous json report")
+    parser.add_argument('--tolerance', type=float, default=.1, help="allowed slowdown before failing")
+    args = parser.parse_args(argv)
+
+    if args.backend is not None:
+        cgt_math.set_rotation_backend(args.backend)
+
+    report = run(args.frames, args.seed, args.repeat, args.bpy, args.only)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+
+    print_report(report, baseline)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=4)
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
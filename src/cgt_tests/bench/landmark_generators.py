@@ -0,0 +1,153 @@
+""" Synthetic, mediapipe shaped landmark data for benchmarking the calculator nodes.
+    Templates get animated by a smooth rotation, a slow random walk and per frame jitter,
+    so rotations change continuously like in a real recording without requiring mediapipe. """
+from __future__ import annotations
+from typing import List, Any
+import numpy as np
+
+
+# region templates
+def hand_template() -> np.ndarray:
+    """ Returns 21 hand world landmarks in meters (wrist, then four joints per finger). """
+    landmarks = [[0., 0., 0.]]
+    # finger base offsets and segment lengths from thumb to pinky
+    bases = [[-.03, -.02, -.01], [-.025, -.085, 0.], [-.003, -.09, 0.], [.017, -.085, 0.], [.033, -.075, 0.]]
+    lengths = [[.035, .032, .025, .02], [.0, .04, .025, .022], [.0, .045, .028, .023],
+               [.0, .042, .026, .022], [.0, .032, .02, .018]]
+    for base, segments in zip(bases, lengths):
+        joint = np.array(base)
+        direction = joint / np.linalg.norm(joint)
+        for length in segments:
+            joint = joint + direction * length
+            landmarks.append(joint.tolist())
+    return np.array(landmarks)
+
+
+def pose_template() -> np.ndarray:
+    """ Returns 33 pose world landmarks in meters, the hip center is the origin and y points down. """
+    return np.array([
+        [0., -.62, -.08],                                                   # nose
+        [-.02, -.65, -.07], [-.035, -.65, -.07], [-.05, -.65, -.07],        # left eye
+        [.02, -.65, -.07], [.035, -.65, -.07], [.05, -.65, -.07],           # right eye
+        [-.075, -.63, 0.], [.075, -.63, 0.],                                # ears
+        [-.025, -.58, -.07], [.025, -.58, -.07],                            # mouth
+        [-.18, -.45, 0.], [.18, -.45, 0.],                                  # shoulders
+        [-.22, -.2, .02], [.22, -.2, .02],                                  # elbows
+        [-.24, .03, -.03], [.24, .03, -.03],                                # wrists
+        [-.26, .08, -.04], [.26, .08, -.04],                                # pinky
+        [-.25, .09, -.05], [.25, .09, -.05],                                # index
+        [-.22, .06, -.05], [.22, .06, -.05],                                # thumb
+        [-.1, 0., 0.], [.1, 0., 0.],                                        # hips
+        [-.11, .42, -.02], [.11, .42, -.02],                                # knees
+        [-.12, .82, .03], [.12, .82, .03],                                  # ankles
+        [-.12, .86, .06], [.12, .86, .06],                                  # heels
+        [-.13, .88, -.1], [.13, .88, -.1],                                  # foot index
+    ])
+
+
+def face_template(rng: np.random.Generator = None) -> np.ndarray:
+    """ Returns 468 face mesh landmarks in normalized image coordinates on the front of an ellipsoid. """
+    if rng is None:
+        rng = np.random.default_rng(0)
+    landmarks = np.zeros((468, 3))
+    theta = rng.uniform(-1.2, 1.2, 468)
+    phi = rng.uniform(-1.3, 1.3, 468)
+    landmarks[:, 0] = .5 + .18 * np.sin(theta) * np.cos(phi)
+    landmarks[:, 1] = .5 + .24 * np.sin(phi)
+    landmarks[:, 2] = -.1 * np.cos(theta) * np.cos(phi)
+
+    # landmarks which are used by the face calculator
+    key_landmarks = {
+        1: [.5, .52, -.1],                                                  # nose tip
+        4: [.5, .5, -.1],
+        10: [.5, .26, -.02],                                                # forehead
+        13: [.5, .64, -.08], 14: [.5, .66, -.08],                           # lips
+        33: [.38, .42, -.05], 133: [.45, .42, -.06],                        # right eye corners
+        152: [.5, .74, -.04],                                               # chin
+        159: [.415, .41, -.06], 145: [.415, .43, -.06],                     # right eye lids
+        263: [.62, .42, -.05], 362: [.55, .42, -.06],                       # left eye corners
+        386: [.585, .41, -.06], 374: [.585, .43, -.06],                     # left eye lids
+        61: [.43, .65, -.07], 291: [.57, .65, -.07],                        # mouth corners
+        70: [.37, .37, -.05], 105: [.42, .36, -.06], 107: [.46, .37, -.06], # right brow
+        336: [.54, .37, -.06], 334: [.58, .36, -.06], 300: [.63, .37, -.05],# left brow
+        234: [.32, .48, 0.], 454: [.68, .48, 0.],                           # cheeks
+    }
+    for idx, location in key_landmarks.items():
+        landmarks[idx] = location
+    return landmarks
+# endregion
+
+
+# region animation
+def rotation_matrices(frames: int, rng: np.random.Generator, amplitude: float = .6) -> np.ndarray:
+    """ Smooth rotations as (F, 3, 3) matrices, angles follow sines with random phase and frequency. """
+    t = np.arange(frames)[:, None]
+    frequency = rng.uniform(.005, .03, 3)
+    phase = rng.uniform(0, np.pi * 2, 3)
+    x, y, z = (amplitude * np.sin(t * frequency + phase)).T
+
+    cx, sx, cy, sy, cz, sz = np.cos(x), np.sin(x), np.cos(y), np.sin(y), np.cos(z), np.sin(z)
+    matrices = np.empty((frames, 3, 3))
+    matrices[:, 0] = np.stack([cy * cz, sx * sy * cz - cx * sz, cx * sy * cz + sx * sz], axis=-1)
+    matrices[:, 1] = np.stack([cy * sz, sx * sy * sz + cx * cz, cx * sy * sz - sx * cz], axis=-1)
+    matrices[:, 2] = np.stack([-sy, sx * cy, cx * cy], axis=-1)
+    return matrices
+
+
+def animate(template: np.ndarray, frames: int, seed: int = 0, pivot: np.ndarray = None,
+            jitter: float = .002, drift: float = .0005) -> np.ndarray:
+    """ Animates the template over frames and returns a (F, N, 3) landmark array.
+        Landmarks get rotated around the pivot, translated by a random walk and jittered per landmark. """
+    rng = np.random.default_rng(seed)
+    if pivot is None:
+        pivot = template.mean(axis=0)
+
+    matrices = rotation_matrices(frames, rng)
+    landmarks = np.einsum('fij,nj->fni', matrices, template - pivot) + pivot
+    landmarks += np.cumsum(rng.normal(scale=drift, size=(frames, 1, 3)), axis=0)
+    landmarks += rng.normal(scale=jitter, size=landmarks.shape)
+    return landmarks
+
+
+def hand_sequence(frames: int, seed: int = 0) -> np.ndarray:
+    return animate(hand_template(), frames, seed, pivot=np.zeros(3), jitter=.001)
+
+
+def pose_sequence(frames: int, seed: int = 0) -> np.ndarray:
+    return animate(pose_template(), frames, seed, pivot=np.zeros(3), jitter=.005)
+
+
+def face_sequence(frames: int, seed: int = 0) -> np.ndarray:
+    return animate(face_template(np.random.default_rng(seed)), frames, seed, jitter=.0005, drift=.0002)
+# endregion
+
+
+# region payloads
+def cvt2landmark_list(landmarks: np.ndarray) -> List[List[Any]]:
+    """ Converts a (N, 3) array to the detectors landmark list format `[[idx, [x, y, z]], ...]`. """
+    return [[idx, landmark] for idx, landmark in enumerate(landmarks.tolist())]
+
+
+def hand_payloads(left: np.ndarray, right: np.ndarray = None) -> List[List[Any]]:
+    """ Hand detector results per frame: `[[left_hand], [right_hand]]`. """
+    if right is None:
+        right = left
+    return [[[cvt2landmark_list(l_hand)], [cvt2landmark_list(r_hand)]] for l_hand, r_hand in zip(left, right)]
+
+
+def face_payloads(face: np.ndarray) -> List[List[Any]]:
+    """ Face detector results per frame: `[face]`. """
+    return [[cvt2landmark_list(landmarks)] for landmarks in face]
+
+
+def pose_payloads(pose: np.ndarray) -> List[List[Any]]:
+    """ Pose detector results per frame: `landmarks`. """
+    return [cvt2landmark_list(landmarks) for landmarks in pose]
+
+
+def holistic_payloads(left: np.ndarray, right: np.ndarray, face: np.ndarray, pose: np.ndarray) -> List[List[Any]]:
+    """ Holistic detector results per frame: `[[right_hand, left_hand], [face], pose]`. """
+    return [[[[cvt2landmark_list(r_hand)], [cvt2landmark_list(l_hand)]], [cvt2landmark_list(landmarks)],
+             cvt2landmark_list(pose_landmarks)]
+            for l_hand, r_hand, landmarks, pose_landmarks in zip(left, right, face, pose)]
+# endregion
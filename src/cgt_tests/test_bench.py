@@ -0,0 +1,36 @@
+from .bench import landmark_generators as gen
+from .bench import bench_calculators
+import numpy as np
+import unittest
+
+
+class TestBench(unittest.TestCase):
+    frames = 8
+
+    def test_generator_shapes(self):
+        self.assertEqual(gen.hand_sequence(self.frames).shape, (self.frames, 21, 3))
+        self.assertEqual(gen.pose_sequence(self.frames).shape, (self.frames, 33, 3))
+        self.assertEqual(gen.face_sequence(self.frames).shape, (self.frames, 468, 3))
+        self.assertTrue(np.allclose(gen.hand_sequence(self.frames, 3), gen.hand_sequence(self.frames, 3)))
+
+    def test_payloads(self):
+        hand, face, pose = gen.hand_sequence(2), gen.face_sequence(2), gen.pose_sequence(2)
+        r_hand, l_hand = gen.holistic_payloads(hand, hand, face, pose)[0][0]
+        self.assertEqual(len(r_hand[0]), 21)
+        self.assertEqual(r_hand[0][5][0], 5)
+        self.assertEqual(len(gen.face_payloads(face)[0][0]), 468)
+        self.assertEqual(len(gen.pose_payloads(pose)[0]), 33)
+
+    def test_run(self):
+        report = bench_calculators.run(self.frames, repeat=1)
+        self.assertIn('holistic.update', report['results'])
+        self.assertIn('hand.z_angles.PROJECTION', report['results'])
+        for name, result in report['results'].items():
+            self.assertEqual(result['frames'], self.frames)
+            self.assertGreater(result['fps'], 0)
+            self.assertIn('peak_bytes', result)
+        self.assertEqual(bench_calculators.compare(report, report), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+from ..cgt_core.cgt_calculators_nodes.calc_landmark_filter import (
+    LandmarkFilterNode, SavitzkyGolayFilter, OneEuroFilter, ExponentialFilter)
+from ..cgt_core.cgt_calculators_nodes.mp_calc_pose_rot import PoseRotationCalculator
+from .bench import landmark_generators as gen
+import numpy as np
+import unittest
+
+
+class TestLandmarkFilter(unittest.TestCase):
+    frames = 40
+
+    def test_savitzky_golay_preserves_polynomials(self):
+        t = np.arange(self.frames, dtype=np.float64)
+        signal = (.3 * t ** 2 - 2 * t + 1)[:, None, None] * np.ones((1, 4, 3))
+        sg_filter = SavitzkyGolayFilter((4, 3), window=7, order=2)
+        for x in signal:
+            self.assertTrue(np.allclose(sg_filter(x, 1.), x))
+
+    def test_filters_reduce_noise(self):
+        rng = np.random.default_rng(0)
+        noise = rng.normal(scale=.01, size=(self.frames * 5, 10, 3)) + 1.
+        for landmark_filter in [ExponentialFilter((10, 3)), OneEuroFilter((10, 3)), SavitzkyGolayFilter((10, 3))]:
+            filtered = np.array([landmark_filter(x, 1 / 30).copy() for x in noise])
+            self.assertTrue(np.allclose(filtered[0], noise[0]))
+            self.assertLess(filtered[20:].std(), noise[20:].std() * .9)
+
+            # constant input remains constant
+            landmark_filter.reset()
+            for _ in range(10):
+                self.assertTrue(np.allclose(landmark_filter(np.ones((10, 3)), 1 / 30), 1.))
+
+    def test_node_filters_nested_results(self):
+        hand, face, pose = gen.hand_sequence(self.frames), gen.face_sequence(self.frames), gen.pose_sequence(self.frames)
+        payloads = gen.holistic_payloads(hand, hand, face, pose)
+        # right hand isn't detected in a frame
+        payloads[20][0][0] = []
+
+        for filter_type in LandmarkFilterNode.filter_types:
+            node = LandmarkFilterNode(filter_type)
+            filtered = [node.update(payload, frame)[0] for frame, payload in enumerate(payloads)]
+
+            # shape and indices remain, the filter restarts once a hand gets detected again
+            self.assertEqual(filtered[20][0][0], [])
+            self.assertEqual(filtered[21][0][0], payloads[21][0][0])
+            self.assertEqual([idx for idx, _ in filtered[5][2]], list(range(33)))
+
+            # matches offline filtering
+            pose_sequence = node.process_sequence(pose)
+            for frame in range(self.frames):
+                self.assertTrue(np.allclose([loc for _, loc in filtered[frame][2]], pose_sequence[frame]))
+
+    def test_duplicated_frames_pass_through(self):
+        pose = gen.pose_sequence(2)
+        # pose moves for one frame, then the same raw frame repeats
+        payloads = [gen.cvt2landmark_list(pose[0])] + [gen.cvt2landmark_list(pose[1]) for _ in range(4)]
+
+        for filter_type in LandmarkFilterNode.filter_types:
+            node, calculator = LandmarkFilterNode(filter_type), PoseRotationCalculator()
+            filtered = [node.update(payload, frame)[0] for frame, payload in enumerate(payloads)]
+            self.assertTrue(all(filtered[frame] == filtered[1] for frame in range(2, 5)))
+
+            for frame, data in enumerate(filtered):
+                calculator.update(data, frame)
+            self.assertEqual(calculator.duplicated_frames, {('pose', 0): 3})
+
+    def test_process_sequence_resets_on_nan(self):
+        hand = gen.hand_sequence(self.frames)
+        hand[10] = np.nan
+        filtered = LandmarkFilterNode('EXPONENTIAL').process_sequence(hand)
+        self.assertTrue(np.all(np.isnan(filtered[10])))
+        self.assertTrue(np.allclose(filtered[11], hand[11]))
+
+
+if __name__ == '__main__':
+    unittest.main()
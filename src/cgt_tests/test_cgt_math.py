@@ -180,6 +180,119 @@ class TestMathutils(unittest.TestCase):
         q = [-1, 0, 0, 0]
         self.assertEqual(matrix3x3_to_quaternion(m), q)
 
+    def test_batch_kernels(self):
+        rng = np.random.default_rng(0)
+        a, b, c = rng.normal(size=(3, 4, 6, 3))
+        length = batch_vector_length(a)
+        self.assertEqual(length.shape, (4, 6))
+        self.assertTrue(np.allclose(batch_normalize(a), a / length[..., np.newaxis]))
+        self.assertTrue(np.allclose(batch_to_vector(a, b), b - a))
+
+        for f in range(4):
+            for n in range(6):
+                self.assertAlmostEqual(batch_angle_between(a, b)[f, n], angle_between(a[f, n], b[f, n]))
+                self.assertTrue(np.allclose(
+                    batch_project_point_on_vector(a, b, c)[f, n], project_point_on_vector(a[f, n], b[f, n], c[f, n])))
+
+    def test_batch_planes(self):
+        rng = np.random.default_rng(1)
+        planes = rng.normal(size=(5, 3, 3))
+        points = rng.normal(size=(5, 3))
+        normals = batch_normal_from_plane(planes)
+        distances = batch_distance_from_plane(points, normals, planes[:, 0])
+        self.assertEqual(normals.shape, (5, 3))
+        self.assertEqual(distances.shape, (5,))
+        for plane, point, normal, dist in zip(planes, points, normals, distances):
+            self.assertTrue(np.allclose(normal, np.cross(plane[1] - plane[0], plane[2] - plane[0])))
+            self.assertAlmostEqual(dist, np.dot(point - plane[0], normal))
+
+        projected = batch_project_vec_from_normal(normals, points)
+        self.assertTrue(np.allclose(batch_dot(projected, normals), 0))
+
+    def test_batch_get_closest_idx(self):
+        points = np.array([[[0, 0, 0], [1, 0, 0], [0, 2, 0]],
+                           [[5, 5, 5], [0, 0, 1], [1, 1, 1]]])
+        targets = np.array([[0, 1.5, 0], [0.9, 0.9, 0.9]])
+        self.lists_equals(batch_get_closest_idx(targets, points), [2, 2])
+        self.assertEqual(get_closest_idx(targets[0], points[0]), 2)
+
+    def test_batch_rotate_point_euler(self):
+        points = np.array([[10., 10., 10.], [1., -2., 3.]])
+        euler = [30, 45, -60]
+        rotated = batch_rotate_point_euler(points, euler)
+        for point, res in zip(points, rotated):
+            self.assertTrue(np.allclose(rotate_point_euler(point.copy(), euler), res))
+
+    @unittest.skipIf(Euler is None, "requires mathutils")
+    def test_batch_decompose_matrix(self):
+        rng = np.random.default_rng(2)
+        matrices = rng.normal(size=(50, 3, 3))
+        matrices[0] = np.eye(3)
+        matrices[1] = np.diag([-1, 1, -1])
+        quaternions = batch_decompose_matrix(matrices)
+        self.assertEqual(quaternions.shape, (50, 4))
+        for matrix, quart in zip(matrices, quaternions):
+            _, m_quart, _ = decompose_matrix(generate_matrix(*matrix))
+            # q and -q represent the same rotation
+            self.assertTrue(np.allclose(m_quart, quart, atol=1e-6) or np.allclose(m_quart, -quart, atol=1e-6))
+
+    @unittest.skipIf(Euler is None, "requires mathutils")
+    def test_batch_quaternion_to_euler(self):
+        rng = np.random.default_rng(3)
+        quaternions = batch_normalize(rng.normal(size=(50, 4)))
+        compat = rng.uniform(-10, 10, size=(50, 3))
+        eulers = batch_quaternion_to_euler(quaternions)
+        compat_eulers = batch_quaternion_to_euler(quaternions, compat)
+        for quart, combat, euler, compat_euler in zip(quaternions, compat, eulers, compat_eulers):
+            self.assertTrue(np.allclose(Quaternion(quart).to_euler('XYZ'), euler, atol=1e-5))
+            self.assertTrue(np.allclose(Quaternion(quart).to_euler('XYZ', Euler(combat)), compat_euler, atol=1e-5))
+            self.assertTrue(np.allclose(Euler(euler).to_quaternion(), batch_euler_to_quaternion(euler)))
+
+    def test_batch_unwrap_eulers(self):
+        # smooth quaternion tracks spanning multiple turns
+        rng = np.random.default_rng(5)
+        quaternions = batch_euler_to_quaternion(np.cumsum(rng.normal(scale=.1, size=(500, 4, 3)), axis=0))
+
+        compat = np.full((4, 3), 6.)
+        eulers = batch_unwrap_eulers(quaternions, compat)
+        self.assertEqual(eulers.shape, (500, 4, 3))
+        self.assertTrue(np.all(np.abs(np.diff(eulers, axis=0)) < np.pi))
+        self.assertTrue(np.allclose(batch_quaternion_to_matrix(quaternions),
+                                    batch_quaternion_to_matrix(batch_euler_to_quaternion(eulers))))
+
+        # matches converting frame by frame using the previous euler as compat
+        for quart, euler in zip(quaternions, eulers):
+            compat = batch_quaternion_to_euler(quart, compat)
+            self.assertTrue(np.allclose(compat, euler))
+
+    @unittest.skipIf(Euler is None, "requires mathutils")
+    def test_batch_track_quaternion(self):
+        rng = np.random.default_rng(4)
+        vectors = rng.normal(size=(50, 3))
+        for track, up in [('Z', 'Y'), ('-Y', 'Z'), ('X', 'Z'), ('-X', 'Y')]:
+            quaternions = batch_track_quaternion(vectors, track, up)
+            for vector, quart in zip(vectors, quaternions):
+                m_quart = rotate_towards(np.zeros(3), vector, track, up)
+                self.assertTrue(np.allclose(m_quart, quart, atol=1e-5) or np.allclose(m_quart, -quart, atol=1e-5))
+        self.lists_equals(batch_track_quaternion(np.zeros(3)), [1, 0, 0, 0])
+
+    @unittest.skipIf(Euler is None, "requires mathutils")
+    def test_rotation_backend(self):
+        tangent, normal, binormal = batch_normalize(np.array([[1, .2, 0], [-.1, 1, .3], [0, -.3, 1]]))
+        _, quart, _ = decompose_matrix(generate_matrix(tangent, normal, binormal))
+        euler = to_euler(quart, Euler((0, 0, 6)))
+        try:
+            set_rotation_backend('NUMPY')
+            _, np_quart, _ = decompose_matrix(generate_matrix(tangent, normal, binormal))
+            np_euler = to_euler(np_quart, (0, 0, 6))
+            self.assertIsInstance(np_euler, np.ndarray)
+            self.assertIsInstance(create_euler((0, 0, 0)), np.ndarray)
+        finally:
+            set_rotation_backend('MATHUTILS')
+        self.assertTrue(np.allclose(quart, np_quart, atol=1e-6))
+        self.assertTrue(np.allclose(euler, np_euler, atol=1e-6))
+        self.assertIsInstance(create_euler((0, 0, 0)), Euler)
+
     def lists_almost_equals(self, l1, l2):
         for a, b in zip(l1, l2):
             self.assertAlmostEqual(a, b)
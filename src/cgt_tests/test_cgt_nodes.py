@@ -0,0 +1,99 @@
+from ..cgt_core.cgt_patterns import cgt_nodes, cgt_node_worker
+import unittest
+
+
+class CountingInput(cgt_nodes.InputNode):
+    def __init__(self, frames, chains=None):
+        self.frames = frames
+        self.chains = chains
+
+    def update(self, data, frame):
+        if frame >= self.frames:
+            return None, frame
+        if self.chains is None:
+            return [frame], frame
+        return [[frame] for _ in range(self.chains)], frame
+
+
+class AddCalculator(cgt_nodes.CalculatorNode):
+    def update(self, data, frame):
+        return [value + 1 for value in data], frame
+
+
+class RecordingOutput(cgt_nodes.OutputNode):
+    def __init__(self):
+        self.received = []
+
+    def update(self, data, frame):
+        self.received.append((data, frame))
+        return data, frame
+
+    def flush(self):
+        self.received.append('flushed')
+
+
+def get_chain(output=None):
+    chain = cgt_nodes.NodeChain()
+    chain.append(AddCalculator())
+    chain.append(output or RecordingOutput())
+    return chain
+
+
+class TestNodes(unittest.TestCase):
+    def test_split_output_nodes(self):
+        outputs = [RecordingOutput(), RecordingOutput()]
+        group = cgt_nodes.NodeChainGroup()
+        for output in outputs:
+            group.nodes.append(get_chain(output))
+        chain = cgt_nodes.NodeChain()
+        chain.append(CountingInput(10, len(outputs)))
+        chain.append(group)
+
+        calculator_chain, output_chain = cgt_nodes.split_output_nodes(chain)
+        data, frame = calculator_chain.update([], 3)
+        self.assertEqual(data, [[4], [4]])
+        self.assertEqual(outputs[0].received, [])
+
+        output_chain.update(data, frame)
+        self.assertEqual([output.received for output in outputs], [[([4], 3)], [([4], 3)]])
+
+    def test_flush_output_nodes(self):
+        outputs = [RecordingOutput(), RecordingOutput()]
+        group = cgt_nodes.NodeChainGroup()
+        for output in outputs:
+            group.nodes.append(get_chain(output))
+        self.assertEqual(cgt_nodes.output_nodes(group), outputs)
+
+        cgt_nodes.flush_output_nodes(group)
+        self.assertEqual([output.received for output in outputs], [['flushed'], ['flushed']])
+
+    def test_calculator_nodes(self):
+        group = cgt_nodes.NodeChainGroup()
+        for _ in range(2):
+            group.nodes.append(get_chain())
+        chain = cgt_nodes.NodeChain()
+        chain.append(CountingInput(10, 2))
+        chain.append(group)
+        self.assertEqual(cgt_nodes.calculator_nodes(chain), [node_chain.nodes[0] for node_chain in group.nodes])
+
+    def test_node_worker(self):
+        output = RecordingOutput()
+        chain = get_chain(output)
+        chain.nodes.insert(0, CountingInput(20))
+        calculator_chain, output_chain = cgt_nodes.split_output_nodes(chain)
+
+        worker = cgt_node_worker.NodeWorker(calculator_chain, frame=0, key_step=2, maxsize=2)
+        self.assertFalse(chain.nodes[1].reuse_buffers)
+        worker.start()
+        finished = False
+        while not finished:
+            results, finished = worker.drain()
+            for data, frame in results:
+                output_chain.update(data, frame)
+        worker.stop()
+
+        self.assertEqual(output.received, [([frame + 1], frame) for frame in range(0, 20, 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
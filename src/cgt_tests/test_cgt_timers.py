@@ -0,0 +1,36 @@
+from ..cgt_core.cgt_utils.cgt_timers import FrameClock
+import unittest
+
+
+class TestFrameClock(unittest.TestCase):
+    def test_frames_follow_capture_time(self):
+        clock = FrameClock(fps=25, start_frame=10, key_step=2)
+        self.assertIsNone(clock.next_timestamp())
+        self.assertEqual(clock.frame(100.), 10)
+        self.assertAlmostEqual(clock.next_timestamp(), 100.06)
+
+        # slow detection skips timeline frames
+        self.assertEqual(clock.frame(100.2), 15)
+        self.assertEqual(clock.frame(100.4), 20)
+        self.assertAlmostEqual(clock.effective_key_step, 5.)
+
+    def test_frames_increase(self):
+        clock = FrameClock(fps=25)
+        self.assertEqual(clock.frame(1.), 0)
+        self.assertEqual(clock.frame(1.001), 1)
+        self.assertEqual(clock.frame(1.002), 2)
+
+    def test_latency(self):
+        clock = FrameClock(fps=25)
+        frame = clock.frame(1.)
+        clock.record(frame, now=1.05)
+        self.assertAlmostEqual(clock.latency, .05)
+        self.assertEqual(clock.frames, 1)
+
+        # unknown frames are ignored
+        clock.record(frame, now=2.)
+        self.assertEqual(clock.frames, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+from ..cgt_freemocap.fm_skeleton_data import SkeletonData
+from pathlib import Path
+import tempfile
+import numpy as np
+import unittest
+
+
+class TestSkeletonData(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / 'mediaPipeSkel_3d_smoothed.npy')
+        self.xyz = np.random.default_rng(0).normal(size=(20, 9, 3)) * 1000
+        np.save(self.path, self.xyz)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_transform(self):
+        data = SkeletonData(self.path, axis_order=(0, 2, 1), scale=(-.001, -.001, -.001))
+        expected = self.xyz[..., [0, 2, 1]] * -.001
+        self.assertEqual(data.shape, (20, 9, 3))
+        self.assertIsInstance(data.data, np.memmap)
+        self.assertTrue(np.allclose(data[:], expected))
+
+    def test_slices(self):
+        data = SkeletonData(self.path, axis_order=(0, 2, 1), scale=(-.001, -.001, -.001))
+        expected = self.xyz[..., [0, 2, 1]] * -.001
+        self.assertTrue(np.allclose(data[3], expected[3]))
+        self.assertTrue(np.allclose(data[:, 4], expected[:, 4]))
+        self.assertTrue(np.allclose(data[2:5, 1:3], expected[2:5, 1:3]))
+        self.assertTrue(np.allclose(data[5, :, :], expected[5, :, :]))
+        self.assertTrue(np.allclose(data[:, 2, 1], expected[:, 2, 1]))
+
+    def test_unsupported_keys(self):
+        data = SkeletonData(self.path)
+        for key in [(Ellipsis, 0), Ellipsis, None, (None, 0), (0, 0, 0, 0)]:
+            with self.assertRaises(IndexError):
+                data[key]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+from ..cgt_mediapipe.cgt_mp_core.frame_buffer import FrameRingBuffer
+import threading
+import numpy as np
+import unittest
+
+
+class TestFrameRingBuffer(unittest.TestCase):
+    shape = (4, 6, 3)
+
+    def produce(self, buffer, frames):
+        for value in range(frames):
+            slot = buffer.acquire()
+            if slot is None:
+                break
+            buffer.frames[slot] = value
+            buffer.publish(slot)
+        buffer.close()
+
+    def test_latest_frame_wins(self):
+        buffer = FrameRingBuffer(3, lossless=False)
+        buffer.allocate(self.shape)
+        self.produce(buffer, 10)
+
+        frame = buffer.consume(timeout=0)
+        self.assertTrue(np.all(frame == 9))
+        self.assertIsNone(buffer.consume(timeout=0))
+
+    def test_latest_frame_does_not_block(self):
+        buffer = FrameRingBuffer(3, lossless=False)
+        buffer.allocate(self.shape)
+        self.assertIsNone(buffer.consume(timeout=0))
+
+        # the consumed slot doesn't get overwritten
+        slot = buffer.acquire()
+        buffer.frames[slot] = 1
+        buffer.publish(slot)
+        frame = buffer.consume(timeout=0)
+        for value in range(2, 8):
+            slot = buffer.acquire(timeout=0)
+            buffer.frames[slot] = value
+            buffer.publish(slot)
+        self.assertTrue(np.all(frame == 1))
+        self.assertTrue(np.all(buffer.consume(timeout=0) == 7))
+
+    def test_drop_stale_frames(self):
+        buffer = FrameRingBuffer(3, lossless=False)
+        buffer.allocate(self.shape)
+        slot = buffer.acquire()
+        buffer.frames[slot] = 1
+        buffer.publish(slot, timestamp=1.)
+        self.assertIsNone(buffer.consume(timeout=0, min_timestamp=2.))
+        self.assertEqual(len(buffer), 0)
+
+        slot = buffer.acquire()
+        buffer.frames[slot] = 2
+        buffer.publish(slot, timestamp=2.)
+        frame = buffer.consume(timeout=0, min_timestamp=2.)
+        self.assertTrue(np.all(frame == 2))
+        self.assertEqual(buffer.timestamp, 2.)
+
+    def test_lossless(self):
+        frames = 50
+        buffer = FrameRingBuffer(3, lossless=True)
+        buffer.allocate(self.shape)
+        producer = threading.Thread(target=self.produce, args=(buffer, frames))
+        producer.start()
+
+        received = []
+        while True:
+            frame = buffer.consume(timeout=1.)
+            if frame is None:
+                break
+            received.append(int(frame[0, 0, 0]))
+        producer.join()
+
+        self.assertEqual(received, list(range(frames)))
+        self.assertTrue(buffer.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+from ..cgt_core.cgt_calculators_nodes.mp_calc_face_rot import FaceRotationCalculator
+import numpy as np
+import unittest
+
+
+class TestFaceRotationCalculator(unittest.TestCase):
+    frames = 8
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.face = rng.normal(size=(468, 3)) + rng.normal(size=(self.frames, 468, 3)) * .05
+
+    @staticmethod
+    def get_calculator():
+        return FaceRotationCalculator()
+
+    def test_process_frame_reuses_buffers(self):
+        calculator = self.get_calculator()
+        locations, rotations = calculator.process_frame(self.face[0])
+        next_locations, next_rotations = calculator.process_frame(self.face[1])
+        self.assertIs(locations, next_locations)
+        self.assertIs(rotations, next_rotations)
+        self.assertEqual(locations.shape, (473, 3))
+        self.assertEqual(locations.dtype, np.float32)
+
+    def test_process_sequence_matches_update(self):
+        calculator = self.get_calculator()
+        locations, rotations = calculator.process_sequence(self.face)
+        self.assertEqual(locations.shape, (self.frames, 473, 3))
+        self.assertEqual(rotations.shape, (self.frames, 2, 3))
+
+        calculator = self.get_calculator()
+        for frame, face in enumerate(self.face):
+            (frame_locations, frame_rotations, _), _ = calculator.update(
+                [[[idx, list(landmark)] for idx, landmark in enumerate(face)]], frame)
+
+            self.assertEqual(len(frame_locations), 468)
+            for idx, location in frame_locations:
+                self.assertTrue(np.allclose(locations[frame, idx], location, atol=1e-5))
+
+            self.assertEqual([idx for idx, _ in frame_rotations], [calculator.pivot.idx, calculator.chin_driver.idx])
+            for rotation, (_, euler) in zip(rotations[frame], frame_rotations):
+                self.assertTrue(np.allclose(rotation, euler, atol=1e-5))
+
+            self.assertTrue(np.allclose(locations[frame, 468:], calculator.buffer[468:], atol=1e-5))
+
+    def test_update_reuses_buffers(self):
+        calculator = self.get_calculator()
+        payloads = [[[[idx, list(landmark)] for idx, landmark in enumerate(face)]] for face in self.face[:2]]
+        (locations, _, _), _ = calculator.update(payloads[0], 0)
+        (next_locations, _, _), _ = calculator.update(payloads[1], 1)
+        self.assertIs(locations, next_locations)
+        self.assertTrue(np.shares_memory(next_locations[0][1], calculator.buffer))
+
+        # staged results are copies
+        calculator = self.get_calculator()
+        calculator.reuse_buffers = False
+        (locations, _, _), _ = calculator.update(payloads[0], 0)
+        expected = [location.copy() for _, location in locations]
+        calculator.update(payloads[1], 1)
+        self.assertFalse(np.shares_memory(locations[0][1], calculator.buffer))
+        self.assertTrue(all(np.array_equal(a, b) for (_, a), b in zip(locations, expected)))
+
+    def test_duplicated_frames(self):
+        calculator = self.get_calculator()
+        frames = [self.face[0], self.face[0], self.face[1], self.face[1], self.face[1]]
+        results = [calculator.update([[[idx, list(landmark)] for idx, landmark in enumerate(face)]], frame)[0]
+                   for frame, face in enumerate(frames)]
+        self.assertEqual([len(locations) > 0 for locations, _, _ in results], [True, False, True, False, False])
+        self.assertEqual(calculator.get_duplicated_frame_count(), 3)
+        self.assertEqual(calculator.get_duplicated_frame_count("face"), 3)
+        self.assertEqual(calculator.get_duplicated_frame_count("hand"), 0)
+
+        # streams are compared separately
+        self.assertFalse(calculator.has_duplicated_results(self.face[1], "face", 1))
+        calculator.reset()
+        self.assertEqual(calculator.get_duplicated_frame_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+from ..cgt_core.cgt_calculators_nodes.mp_calc_hand_rot import HandRotationCalculator
+import numpy as np
+import unittest
+
+
+class TestHandRotationCalculator(unittest.TestCase):
+    frames = 12
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.hands = rng.normal(size=(21, 3)) * .05 + rng.normal(size=(self.frames, 21, 3)) * .005
+
+    @staticmethod
+    def get_calculator(z_angle_mode='CIRCLE'):
+        return HandRotationCalculator(z_angle_mode)
+
+    def test_process_sequence_shape(self):
+        locations, angles = self.get_calculator().process_sequence(self.hands)
+        self.assertEqual(locations.shape, (self.frames, 21, 3))
+        self.assertEqual(angles.shape, (self.frames, 21, 3))
+        self.assertTrue(np.allclose(locations[:, 0], 0))
+
+    def test_process_sequence_matches_update(self):
+        for hand_idx, orientation in [(0, "L"), (1, "R")]:
+            locations, angles = self.get_calculator().process_sequence(self.hands, orientation)
+
+            calculator = self.get_calculator()
+            for frame, hand in enumerate(self.hands):
+                data = [[], []]
+                data[hand_idx] = [list(enumerate(hand))]
+                (frame_locations, frame_angles, _), _ = calculator.update(data, frame)
+
+                for idx, location in frame_locations[hand_idx]:
+                    self.assertTrue(np.allclose(locations[frame, idx], location))
+                for idx, angle in frame_angles[hand_idx]:
+                    self.assertTrue(np.allclose(angles[frame, idx], angle))
+
+    def test_absent_hand_is_no_duplicate(self):
+        calculator = self.get_calculator()
+        for frame in range(5):
+            calculator.update([[], [list(enumerate(self.hands[frame]))]], frame)
+        self.assertEqual(calculator.duplicated_frames, {})
+        self.assertFalse(calculator.has_duplicated_results([], "hand", 1))
+        self.assertFalse(calculator.has_duplicated_results(None, "hand", 1))
+        self.assertEqual(calculator.get_duplicated_frame_count("hand"), 0)
+
+    def test_projected_z_angles(self):
+        # the sampled circle has 20 points including start and end, the closest point
+        # may be off by half a step which results in a slightly larger angle
+        half_step = np.pi / 19
+        circle = self.get_calculator('CIRCLE').get_sequence_z_angles(self.hands)
+        projection = self.get_calculator('PROJECTION').get_sequence_z_angles(self.hands)
+
+        mcps = [5, 9, 13, 17]
+        self.assertTrue(np.allclose(circle[:, 1], projection[:, 1]))
+        self.assertTrue(np.all(np.abs(circle[:, mcps]) >= np.abs(projection[:, mcps]) - 1e-9))
+        self.assertTrue(np.all(np.cos(circle[:, mcps]) >= np.cos(projection[:, mcps]) * np.cos(half_step) - 1e-9))
+
+        signed = np.abs(projection[:, mcps]) > 1e-3
+        self.assertTrue(np.all(np.sign(circle[:, mcps][signed]) == np.sign(projection[:, mcps][signed])))
+
+    def test_projected_z_angles_per_frame(self):
+        calculator = self.get_calculator('PROJECTION')
+        hand = [[idx, landmark] for idx, landmark in enumerate(self.hands[0])]
+        self.assertTrue(np.allclose(calculator.get_z_angles(hand), calculator.get_sequence_z_angles(self.hands)[0, :20]))
+
+
+if __name__ == '__main__':
+    unittest.main()
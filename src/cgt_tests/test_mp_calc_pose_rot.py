@@ -0,0 +1,76 @@
+from ..cgt_core.cgt_calculators_nodes.mp_calc_pose_rot import PoseRotationCalculator
+import numpy as np
+import unittest
+
+
+class TestPoseRotationCalculator(unittest.TestCase):
+    frames = 12
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.pose = rng.normal(size=(33, 3)) + rng.normal(size=(self.frames, 33, 3)) * .05
+
+    @staticmethod
+    def get_calculator():
+        return PoseRotationCalculator()
+
+    def test_process_sequence_shape(self):
+        calculator = self.get_calculator()
+        locations, rotations = calculator.process_sequence(self.pose)
+        self.assertEqual(locations.shape, (self.frames, 36, 3))
+        self.assertEqual(rotations.shape, (self.frames, len(calculator.rotation_indices), 3))
+        self.assertTrue(np.allclose(locations[:, calculator.hip_center.idx], 0))
+
+    def test_process_sequence_matches_update(self):
+        locations, rotations = self.get_calculator().process_sequence(self.pose)
+
+        calculator = self.get_calculator()
+        for frame, pose in enumerate(self.pose):
+            (frame_locations, frame_rotations, _), _ = calculator.update(
+                [[idx, list(landmark)] for idx, landmark in enumerate(pose)], frame)
+
+            # custom data gets appended, the last entry of an index is the resulting location
+            for idx, location in dict(frame_locations).items():
+                self.assertTrue(np.allclose(locations[frame, idx], location))
+
+            self.assertEqual([idx for idx, _ in frame_rotations], calculator.rotation_indices)
+            for rotation, (_, euler) in zip(rotations[frame], frame_rotations):
+                self.assertTrue(np.allclose(rotation, euler, atol=1e-6))
+
+    def test_sequence_combat_modes(self):
+        # smooth motion, the unwrapped tracks match the frame by frame combat
+        rng = np.random.default_rng(1)
+        pose = rng.normal(size=(33, 3)) + np.cumsum(rng.normal(size=(200, 33, 3)) * .01, axis=0)
+        _, rotations = self.get_calculator().process_sequence(pose)
+
+        calculator = self.get_calculator()
+        calculator.sequence_combat_mode = 'UNWRAP'
+        _, unwrapped = calculator.process_sequence(pose)
+        self.assertTrue(np.allclose(rotations, unwrapped))
+        # the last rotations are used as combat for following frames
+        self.assertTrue(np.allclose(calculator.prev_rotation[27], unwrapped[-1, -2]))
+
+    def test_instance_state(self):
+        first, second = self.get_calculator(), self.get_calculator()
+        first.process_sequence(self.pose)
+        self.assertGreater(len(first.prev_rotation), 0)
+        self.assertEqual(second.prev_rotation, {})
+
+        # chunks continued from a snapshot match processing the whole sequence
+        _, rotations = self.get_calculator().process_sequence(self.pose)
+        calculator = self.get_calculator()
+        calculator.process_sequence(self.pose[:6])
+        state = calculator.snapshot()
+        _, chunk = calculator.process_sequence(self.pose[6:])
+        clone = self.get_calculator()
+        clone.restore(state)
+        _, cloned_chunk = clone.process_sequence(self.pose[6:])
+        self.assertTrue(np.allclose(rotations[6:], chunk))
+        self.assertTrue(np.allclose(chunk, cloned_chunk))
+
+        calculator.reset()
+        self.assertEqual(calculator.prev_rotation, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+from ..cgt_mediapipe.cgt_mp_core import mp_landmark_cache
+from .bench import landmark_generators as gen
+import tempfile
+import numpy as np
+import unittest
+
+
+class TestLandmarkCache(unittest.TestCase):
+    def get_holistic_frames(self):
+        frames = 6
+        hand, face, pose = gen.hand_sequence(frames), gen.face_sequence(frames), gen.pose_sequence(frames)
+        data = gen.holistic_payloads(hand, hand, face, pose)
+        # detector results without features
+        data[2][0][0] = []
+        data[4] = [[[], []], [[[]]], []]
+        # cast to float32 as mediapipe
+        return [self.to_float32(d) for d in data]
+
+    def to_float32(self, data):
+        if isinstance(data, list):
+            return [self.to_float32(d) for d in data]
+        if isinstance(data, float):
+            return float(np.float32(data))
+        return data
+
+    def test_round_trip(self):
+        frames = self.get_holistic_frames()
+        writer = mp_landmark_cache.LandmarkCacheWriter()
+        for data in frames:
+            writer.append(data)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = mp_landmark_cache.cache_path(cache_dir, "hash", 'HOLISTIC', (1, .5, False))
+            writer.save(path)
+            self.assertTrue(path.is_file())
+
+            reader = mp_landmark_cache.LandmarkCacheReader(path)
+            self.assertEqual(len(reader), len(frames))
+            for data in frames:
+                self.assertEqual(reader.next(), data)
+            self.assertRaises(StopIteration, reader.next)
+
+    def test_cache_path(self):
+        path = mp_landmark_cache.cache_path("cache", "hash", 'POSE', (1, .5))
+        self.assertEqual(path, mp_landmark_cache.cache_path("cache", "hash", 'POSE', (1, .5)))
+        self.assertNotEqual(path, mp_landmark_cache.cache_path("cache", "hash", 'POSE', (1, .6)))
+        self.assertNotEqual(path, mp_landmark_cache.cache_path("cache", "hash", 'HAND', (1, .5)))
+
+
+if __name__ == '__main__':
+    unittest.main()